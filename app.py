@@ -1,14 +1,52 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, g, has_app_context, abort, Response
+from flask import has_request_context, before_render_template, template_rendered, send_from_directory
 import mysql.connector
 from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.utils import safe_join
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup
 import click
 import os
+import subprocess
+import sys
 from pathlib import Path
 import datetime
+import queue
+import threading
+import time
+import hashlib
+import csv
+import io
+import json
+import decimal
+import random
+import sqlite3
+import collections
+import itertools
+import re
+import gzip
+import zlib
+import shutil
+import mimetypes
+import posixpath
+import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+try:
+    import brotli  # optional: enables .br asset variants
+except ImportError:
+    brotli = None
 
 app = Flask(__name__)
 app.secret_key = "change-this-secret-key"  # needed for flash messages
 
+# Cache compiled templates on disk (per-user temp dir) so fresh workers skip
+# re-compiling every template on their first render
+app.jinja_options = {**app.jinja_options, "bytecode_cache": FileSystemBytecodeCache()}
+
+# `flask startup-time` fails if a cold `import app` takes longer than this
+IMPORT_TIME_BUDGET_MS = 500
+
 # MySQL configuration - CHANGE these values to match your MySQL setup
 DB_CONFIG = {
     "host": "localhost",
@@ -17,9 +55,904 @@ DB_CONFIG = {
     "database": "school_erp",
 }
 
+# Storage backend: "mysql" (the default, configured by DB_CONFIG above) or
+# "sqlite" for single-box deployments, tests and benchmarks. With SQLite the
+# database is the file at SQLITE_PATH; create it with `flask init-db`.
+DB_BACKEND = os.environ.get("SCHOOL_ERP_DB_BACKEND", "mysql")
+SQLITE_PATH = os.environ.get("SCHOOL_ERP_SQLITE_PATH", os.path.join(Path(__file__).parent, "school_erp.sqlite3"))
+
+# Applied to every SQLite connection: WAL lets readers run alongside the single
+# writer, and NORMAL sync is durable across app crashes in WAL mode.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA cache_size = -65536",  # 64 MiB page cache
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",
+)
+
+# Connection pool settings
+# pool_size:    connections kept open and reused between requests
+# max_overflow: extra connections allowed during bursts (closed when returned)
+# timeout:      seconds to wait for a free connection before giving up
+# recycle:      seconds after which an idle connection is replaced
+# pre_ping:     check a connection is still alive before handing it out
+DB_POOL_CONFIG = {
+    "pool_size": 5,
+    "max_overflow": 10,
+    "timeout": 10,
+    "recycle": 3600,
+    "pre_ping": True,
+}
+
+# Read replicas for the read-only routes (see "Read replicas" below). With
+# MySQL each entry holds DB_CONFIG overrides, e.g.
+#   SCHOOL_ERP_DB_REPLICAS='[{"host": "10.0.0.12"}, {"host": "10.0.0.13"}]'
+# With SQLite each entry is a database file path. Empty: everything uses the primary.
+DB_REPLICAS = json.loads(os.environ.get("SCHOOL_ERP_DB_REPLICAS", "[]"))
+
+
+# ---------------- SQLite backend ----------------
+# SQLiteConnection/SQLiteCursor speak the small part of the mysql.connector API
+# the app uses (dictionary cursors, %s placeholders, rowcount, column_names,
+# ping) and raise mysql.connector errors, so routes work unchanged on either
+# backend. SQL that differs between the two goes through the sql_* helpers.
+def _sqlite_convert(parse):
+    def convert(value):
+        text = value.decode("utf-8")
+        try:
+            return parse(text)
+        except ValueError:
+            return text
+    return convert
+
+
+sqlite3.register_adapter(datetime.date, lambda d: d.isoformat())
+sqlite3.register_adapter(datetime.datetime, lambda d: d.isoformat(" "))
+sqlite3.register_adapter(decimal.Decimal, str)
+sqlite3.register_converter("DATE", _sqlite_convert(datetime.date.fromisoformat))
+sqlite3.register_converter("DATETIME", _sqlite_convert(datetime.datetime.fromisoformat))
+sqlite3.register_converter("DECIMAL", _sqlite_convert(decimal.Decimal))
+
+
+def _sqlite_error(e, sql=None):
+    """Translate a sqlite3 error into the equivalent mysql.connector error."""
+    message = str(e)
+    errors = mysql.connector.errors
+    if isinstance(e, sqlite3.IntegrityError):
+        return errors.IntegrityError(msg=message, errno=1062 if "UNIQUE" in message else None)
+    if "duplicate column name" in message:
+        return errors.ProgrammingError(msg=message, errno=1060)
+    if "already exists" in message:
+        return errors.ProgrammingError(msg=message, errno=1061 if message.startswith("index") else 1050)
+    if "no such table" in message:
+        return errors.ProgrammingError(msg=message, errno=1146)
+    if "is locked" in message:
+        return errors.OperationalError(msg=message, errno=1205)
+    if isinstance(e, sqlite3.OperationalError):
+        return errors.OperationalError(msg=message)
+    return errors.DatabaseError(msg=message)
+
+
+class SQLiteCursor:
+    def __init__(self, raw, dictionary=False):
+        self._raw = raw
+        self._dictionary = dictionary
+
+    @staticmethod
+    def _translate(sql):
+        return sql.replace("%s", "?")
+
+    def execute(self, operation, params=None):
+        try:
+            self._raw.execute(self._translate(operation), tuple(params or ()))
+        except sqlite3.Error as e:
+            raise _sqlite_error(e) from e
+
+    def executemany(self, operation, seq_params):
+        try:
+            self._raw.executemany(self._translate(operation), [tuple(p) for p in seq_params])
+        except sqlite3.Error as e:
+            raise _sqlite_error(e) from e
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return dict(zip(self.column_names, row))
+
+    def fetchone(self):
+        return self._row(self._raw.fetchone())
+
+    def fetchmany(self, size=1):
+        return [self._row(r) for r in self._raw.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._row(r) for r in self._raw.fetchall()]
+
+    def __iter__(self):
+        for row in self._raw:
+            yield self._row(row)
+
+    @property
+    def column_names(self):
+        return tuple(d[0] for d in self._raw.description or ())
+
+    @property
+    def description(self):
+        return self._raw.description
+
+    @property
+    def rowcount(self):
+        return self._raw.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._raw.lastrowid
+
+    def close(self):
+        self._raw.close()
+
+
+class SQLiteConnection:
+    def __init__(self, path):
+        # Pooled connections move between threads, one user at a time
+        self._raw = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+        for pragma in SQLITE_PRAGMAS:
+            self._raw.execute(pragma)
+
+    def cursor(self, dictionary=False, buffered=None, **kwargs):
+        return SQLiteCursor(self._raw.cursor(), dictionary=dictionary)
+
+    def commit(self):
+        self._raw.commit()
+
+    def rollback(self):
+        self._raw.rollback()
+
+    def begin_write(self):
+        # sqlite3 opens its transaction at the first INSERT/UPDATE/DELETE, so
+        # reads before it would run unlocked; take the write lock up front
+        if self._raw.in_transaction:
+            return
+        try:
+            self._raw.execute("BEGIN IMMEDIATE")
+        except sqlite3.Error as e:
+            raise _sqlite_error(e) from e
+
+    def ping(self, reconnect=False):
+        try:
+            self._raw.execute("SELECT 1")
+        except sqlite3.Error as e:
+            raise _sqlite_error(e) from e
+
+    def is_connected(self):
+        try:
+            self.ping()
+            return True
+        except mysql.connector.Error:
+            return False
+
+    def executescript(self, sql):
+        try:
+            self._raw.executescript(sql)
+        except sqlite3.Error as e:
+            raise _sqlite_error(e) from e
+
+    def close(self):
+        self._raw.close()
+
+
+def connect_raw(replica=None):
+    """Open a new, unpooled connection to the primary, or to a DB_REPLICAS entry."""
+    if DB_BACKEND == "sqlite":
+        return SQLiteConnection(replica or SQLITE_PATH)
+    return mysql.connector.connect(**{**DB_CONFIG, **(replica or {})})
+
+
+def sql_month(column):
+    """SQL expression giving `column`'s month as 'YYYY-MM'."""
+    if DB_BACKEND == "sqlite":
+        return f"strftime('%Y-%m', {column})"
+    return f"DATE_FORMAT({column}, '%Y-%m')"
+
+
+def sql_for_update():
+    """Row-lock suffix for a SELECT. SQLite has no row locks; see begin_write()."""
+    return "" if DB_BACKEND == "sqlite" else " FOR UPDATE"
+
+
+def begin_write(conn):
+    """Start a read-then-write transaction on `conn`.
+
+    MySQL locks rows as the SELECT ... FOR UPDATE reads them. SQLite has one
+    writer at a time, so it takes the database write lock before the reads.
+    """
+    if DB_BACKEND == "sqlite":
+        conn.begin_write()
+
+
+def sql_insert_ignore():
+    return "INSERT OR IGNORE" if DB_BACKEND == "sqlite" else "INSERT IGNORE"
+
+
+def sql_upsert(key_columns, updates):
+    """Conflict clause for an INSERT on a unique key.
+
+    `updates` maps column -> expression, where `{new}` stands for the value the
+    INSERT tried to write, e.g. {"total": "total + {new}"}.
+    """
+    if DB_BACKEND == "sqlite":
+        sets = ", ".join(f"{col} = {expr.format(new=f'excluded.{col}')}" for col, expr in updates.items())
+        return f"ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET {sets}"
+    sets = ", ".join(f"{col} = {expr.format(new=f'VALUES({col})')}" for col, expr in updates.items())
+    return f"ON DUPLICATE KEY UPDATE {sets}"
+
+
+class PooledConnection:
+    """Wrapper around a database connection borrowed from a ConnectionPool.
+
+    Everything is delegated to the real connection except close(), which
+    hands the connection back to the pool instead of closing the socket.
+    Request-scoped connections ignore close() entirely; they are returned
+    by the app-context teardown so every route in a request shares one.
+    """
+
+    def __init__(self, pool, raw, created_at, request_scoped=False):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._request_scoped = request_scoped
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def cursor(self, *args, **kwargs):
+        return TimedCursor(self._raw.cursor(*args, **kwargs))
+
+    def close(self):
+        if not self._request_scoped:
+            self.release()
+
+    def release(self):
+        if self._raw is not None:
+            raw, self._raw = self._raw, None
+            self._pool._return(raw, self._created_at)
+
+
+class ConnectionPool:
+    """Thread-safe pool of database connections with bounded overflow.
+
+    `connect` is a zero-argument callable returning a new raw connection.
+    """
+
+    def __init__(self, connect, pool_size=5, max_overflow=10, timeout=10, recycle=3600, pre_ping=True):
+        self._connect = connect
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size + max_overflow)
+        self._lock = threading.Lock()
+        self._checked_out = 0
+        self._counters = {
+            "checkouts": 0,
+            "connects": 0,
+            "timeouts": 0,
+            "ping_failures": 0,
+            "recycled": 0,
+            "discarded": 0,
+            "wait_seconds": 0.0,
+        }
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._counters[key] += amount
+
+    def _new_raw(self):
+        raw = self._connect()
+        self._count("connects")
+        return raw, time.monotonic()
+
+    def _close_raw(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def connect(self, request_scoped=False):
+        """Borrow a connection, waiting up to `timeout` seconds for a free slot."""
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            self._count("timeouts")
+            raise mysql.connector.errors.PoolError(
+                f"No database connection available within {self.timeout}s "
+                f"(pool_size={self.pool_size}, max_overflow={self.max_overflow})"
+            )
+        self._count("wait_seconds", time.perf_counter() - started)
+
+        try:
+            raw, created_at = self._checkout_raw()
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._checked_out += 1
+            self._counters["checkouts"] += 1
+        record_db_connect(time.perf_counter() - started)
+        return PooledConnection(self, raw, created_at, request_scoped=request_scoped)
+
+    def _checkout_raw(self):
+        while True:
+            try:
+                raw, created_at = self._idle.get_nowait()
+            except queue.Empty:
+                return self._new_raw()
+
+            if self.recycle and time.monotonic() - created_at > self.recycle:
+                self._count("recycled")
+                self._close_raw(raw)
+                continue
+            if self.pre_ping:
+                try:
+                    raw.ping(reconnect=False)
+                except Exception:
+                    self._count("ping_failures")
+                    self._close_raw(raw)
+                    continue
+            return raw, created_at
+
+    def _return(self, raw, created_at):
+        try:
+            # End any open transaction so the next borrower starts clean
+            raw.rollback()
+            reusable = self._idle.qsize() < self.pool_size
+        except Exception:
+            reusable = False
+
+        if reusable:
+            self._idle.put((raw, created_at))
+        else:
+            self._count("discarded")
+            self._close_raw(raw)
+
+        with self._lock:
+            self._checked_out -= 1
+        self._slots.release()
+
+    def dispose(self):
+        """Close every idle connection (checked-out ones close when returned)."""
+        while True:
+            try:
+                raw, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._close_raw(raw)
+
+    def stats(self):
+        with self._lock:
+            data = dict(self._counters)
+            data["checked_out"] = self._checked_out
+        data["idle"] = self._idle.qsize()
+        data["pool_size"] = self.pool_size
+        data["max_overflow"] = self.max_overflow
+        data["wait_seconds"] = round(data["wait_seconds"], 4)
+        return data
+
+
+_db_pool = None
+_db_pool_lock = threading.Lock()
+
+
+def get_db_pool():
+    """Return the process-wide connection pool, creating it on first use."""
+    global _db_pool
+    if _db_pool is None:
+        with _db_pool_lock:
+            if _db_pool is None:
+                _db_pool = ConnectionPool(connect_raw, **DB_POOL_CONFIG)
+    return _db_pool
+
+
+def get_db_connection(read_only=False):
+    """Return a pooled connection.
+
+    Inside an app/request context the same connection is reused for the whole
+    request and given back to the pool at teardown, so calling close() on it
+    is harmless. Outside a context the caller owns it and close() returns it.
+    Routes marked @reads_from_replica, and callers passing read_only=True,
+    get a replica connection when one is usable (see "Read replicas").
+    """
+    if not has_app_context():
+        return (getattr(_fanout_local, "pool", None) or get_db_pool()).connect()
+    if read_only or g.get("db_read_only"):
+        conn = _replica_connection()
+        if conn is not None:
+            return conn
+    conn = g.get("db_conn")
+    if conn is None:
+        conn = get_db_pool().connect(request_scoped=True)
+        g.db_conn = conn
+    return conn
+
+
+@app.teardown_appcontext
+def release_db_connection(exc):
+    for name in ("db_conn", "db_replica_conn"):
+        conn = g.pop(name, None)
+        if conn is not None:
+            conn.release()
+
+
+# ---------------- Read replicas ----------------
+# GET requests to routes marked @reads_from_replica, plus reads that pass
+# read_only=True (the header notice feed), go to a replica from DB_REPLICAS.
+# A replica is skipped, and reads fall back to the primary, when:
+#   - it failed to connect in the last REPLICA_RETRY_AFTER seconds, or
+#   - it lags by more than REPLICA_MAX_LAG seconds.
+# Lag comes from table_versions: a table whose replica version is behind the
+# primary's has been missing the primary's newest write to it since that
+# write's updated_at. Every REPLICA_CHECK_INTERVAL seconds one request
+# compares the two. A user who writes is pinned to the primary for
+# READ_YOUR_WRITES_SECONDS, through the session cookie, so they see their
+# own change.
+REPLICA_MAX_LAG = 5
+REPLICA_CHECK_INTERVAL = 2
+REPLICA_RETRY_AFTER = 10
+READ_YOUR_WRITES_SECONDS = 5
+
+
+class Replica:
+    """A DB_REPLICAS entry with its own pool and last known health."""
+
+    def __init__(self, target):
+        self.target = target
+        self.pool = ConnectionPool(lambda: connect_raw(target), **DB_POOL_CONFIG)
+        self.down_until = 0.0
+        self.lag = None  # seconds; None until first checked
+        self.error = None
+
+    def usable(self):
+        return self.down_until <= time.monotonic() and self.lag is not None and self.lag <= REPLICA_MAX_LAG
+
+    def mark_down(self, error):
+        app.logger.warning("Replica %s unavailable, reading from the primary: %s", self.name, error)
+        self.down_until = time.monotonic() + REPLICA_RETRY_AFTER
+        self.lag = None
+        self.error = str(error)
+
+    @property
+    def name(self):
+        return self.target if isinstance(self.target, str) else self.target.get("host", "?")
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "usable": self.usable(),
+            "lag_seconds": None if self.lag is None else round(self.lag, 1),
+            "error": self.error,
+            "pool": self.pool.stats(),
+        }
+
+
+_replicas = None
+_replica_rr = itertools.count()
+_replica_checked_at = 0.0
+_replica_check_lock = threading.Lock()
+
+
+def get_replicas():
+    global _replicas
+    if _replicas is None:
+        with _db_pool_lock:
+            if _replicas is None:
+                _replicas = [Replica(target) for target in DB_REPLICAS]
+    return _replicas
+
+
+def _read_table_versions(pool):
+    conn = pool.connect()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT table_name, version, updated_at FROM table_versions")
+        versions = {name: (version, updated_at) for name, version, updated_at in cursor.fetchall()}
+        cursor.close()
+        return versions
+    finally:
+        conn.close()
+
+
+def replica_lag(primary_versions, replica_versions):
+    """Seconds the replica has been missing a write the primary has (0 if none)."""
+    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    lag = 0.0
+    for table, (version, updated_at) in primary_versions.items():
+        if replica_versions.get(table, (0, None))[0] < version:
+            lag = max(lag, (now - updated_at).total_seconds())
+    return lag
+
+
+def check_replicas(force=False):
+    """Refresh every replica's lag, at most once per REPLICA_CHECK_INTERVAL."""
+    global _replica_checked_at
+    now = time.monotonic()
+    if not force and now - _replica_checked_at < REPLICA_CHECK_INTERVAL:
+        return
+    # One request does the check; the rest use the last result
+    if not _replica_check_lock.acquire(blocking=False):
+        return
+    try:
+        _replica_checked_at = now
+        try:
+            primary = _read_table_versions(get_db_pool())
+        except mysql.connector.Error as e:
+            app.logger.warning("Replica check skipped, primary unavailable: %s", e)
+            return
+        for replica in get_replicas():
+            if replica.down_until > now:
+                continue
+            try:
+                replica.lag = replica_lag(primary, _read_table_versions(replica.pool))
+                replica.error = None
+            except Exception as e:
+                replica.mark_down(e)
+    finally:
+        _replica_check_lock.release()
+
+
+def pick_replica():
+    """A usable replica (round robin), or None to read from the primary."""
+    replicas = get_replicas()
+    if not replicas:
+        return None
+    check_replicas()
+    usable = [r for r in replicas if r.usable()]
+    if not usable:
+        return None
+    return usable[next(_replica_rr) % len(usable)]
+
+
+def reads_from_replica(f):
+    """Mark a view as read-only, so its GET requests may be served by a replica."""
+    f.reads_from_replica = True
+    return f
+
+
+def note_db_write():
+    """Pin the current user's reads to the primary for a few seconds."""
+    if has_request_context():
+        g.db_wrote = True
+
+
+def _request_replica():
+    """The replica this request reads from, chosen once per request, or None."""
+    if "db_replica" not in g:
+        g.db_replica = None
+        pinned = session.get("db_primary_until", 0) > time.time() or g.get("db_wrote")
+        if DB_REPLICAS and not pinned:
+            g.db_replica = pick_replica()
+    return g.db_replica
+
+
+def _replica_connection():
+    if "db_replica_conn" not in g:
+        g.db_replica_conn = None
+        replica = _request_replica() if has_request_context() else None
+        if replica is not None:
+            try:
+                g.db_replica_conn = replica.pool.connect(request_scoped=True)
+            except Exception as e:
+                replica.mark_down(e)
+    return g.db_replica_conn
+
+
+def read_pool():
+    """Pool for reads made off the request connection (exports, fan-out)."""
+    if has_request_context() and g.get("db_read_only"):
+        replica = _request_replica()
+        if replica is not None and replica.usable():
+            return replica.pool
+    return get_db_pool()
+
+
+@app.before_request
+def route_reads_to_replica():
+    view = app.view_functions.get(request.endpoint)
+    g.db_read_only = request.method in ("GET", "HEAD") and getattr(view, "reads_from_replica", False)
+
+
+@app.after_request
+def pin_writer_to_primary(response):
+    if g.get("db_wrote") and DB_REPLICAS and READ_YOUR_WRITES_SECONDS:
+        session["db_primary_until"] = time.time() + READ_YOUR_WRITES_SECONDS
+    return response
+
+
+# ---------------- Request timing ----------------
+# Each request tracks time spent getting a DB connection, running SQL and
+# rendering templates. The totals go out in a Server-Timing header (visible in
+# the browser's network panel) and in one log line per request; statements
+# slower than SLOW_QUERY_MS are logged with their SQL and endpoint.
+SLOW_QUERY_MS = 200
+SERVER_TIMING_HEADER = True
+
+
+def _request_perf():
+    """Timing counters for the current request, or None outside one."""
+    fanout_perf = getattr(_fanout_local, "perf", None)
+    if fanout_perf is not None:
+        return fanout_perf
+    if not has_request_context():
+        return None
+    perf = g.get("perf")
+    if perf is None:
+        perf = g.perf = {
+            "start": time.perf_counter(),
+            "connect": 0.0,
+            "connections": 0,
+            "db": 0.0,
+            "queries": 0,
+            "render": 0.0,
+        }
+    return perf
+
+
+def record_db_connect(seconds):
+    perf = _request_perf()
+    if perf is not None:
+        perf["connect"] += seconds
+        perf["connections"] += 1
+
+
+def _record_db_time(seconds, sql=None):
+    perf = _request_perf()
+    if perf is not None:
+        perf["db"] += seconds
+        if sql is not None:
+            perf["queries"] += 1
+    if sql is not None and seconds * 1000 >= SLOW_QUERY_MS:
+        endpoint = request.endpoint if has_request_context() else (perf or {}).get("endpoint")
+        app.logger.warning(
+            "slow query: %.1f ms endpoint=%s sql=%s",
+            seconds * 1000, endpoint or "-", " ".join(str(sql).split())[:1000],
+        )
+
+
+class TimedCursor:
+    """Cursor wrapper that times statements and fetches for the request stats."""
+
+    def __init__(self, raw):
+        self._raw = raw
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __iter__(self):
+        return iter(self._raw)
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._raw.execute(operation, params, *args, **kwargs)
+        finally:
+            _record_db_time(time.perf_counter() - started, operation)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._raw.executemany(operation, seq_params, *args, **kwargs)
+        finally:
+            _record_db_time(time.perf_counter() - started, operation)
+
+    def _timed_fetch(self, method, *args):
+        started = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            _record_db_time(time.perf_counter() - started)
+
+    def fetchone(self):
+        return self._timed_fetch(self._raw.fetchone)
+
+    def fetchmany(self, *args):
+        return self._timed_fetch(self._raw.fetchmany, *args)
+
+    def fetchall(self):
+        return self._timed_fetch(self._raw.fetchall)
+
+
+@before_render_template.connect_via(app)
+def _start_render_timer(sender, template, context, **extra):
+    g.render_started = time.perf_counter()
+
+
+@template_rendered.connect_via(app)
+def _stop_render_timer(sender, template, context, **extra):
+    perf = _request_perf()
+    started = g.pop("render_started", None)
+    if perf is not None and started is not None:
+        perf["render"] += time.perf_counter() - started
+
+
+@app.before_request
+def start_request_timer():
+    _request_perf()
+
+
+@app.after_request
+def add_server_timing(response):
+    perf = _request_perf()
+    total = time.perf_counter() - perf["start"]
+    if SERVER_TIMING_HEADER:
+        response.headers["Server-Timing"] = ", ".join([
+            f'db-connect;dur={perf["connect"] * 1000:.1f};desc="{perf["connections"]} connections"',
+            f'db;dur={perf["db"] * 1000:.1f};desc="{perf["queries"]} queries"',
+            f'render;dur={perf["render"] * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+    app.logger.info("request %s", json.dumps({
+        "method": request.method,
+        "path": request.path,
+        "endpoint": request.endpoint,
+        "status": response.status_code,
+        "total_ms": round(total * 1000, 1),
+        "db_connect_ms": round(perf["connect"] * 1000, 1),
+        "connections": perf["connections"],
+        "db_ms": round(perf["db"] * 1000, 1),
+        "queries": perf["queries"],
+        "render_ms": round(perf["render"] * 1000, 1),
+    }))
+    return response
+
+
+# ---------------- Response compression ----------------
+# HTML, JSON and CSV responses are compressed on the way out when the client
+# accepts it: brotli if available and preferred, otherwise gzip. Buffered
+# responses under COMPRESS_MIN_BYTES are left alone (the headers would cost
+# more than the saving); streamed ones (exports) are compressed chunk by
+# chunk and flushed after each so downloads still arrive progressively.
+# Responses that already carry a Content-Encoding, such as precompressed
+# static files, and file responses are passed through untouched.
+COMPRESS_MIMETYPES = {
+    "text/html", "text/plain", "text/csv", "application/json", "application/x-ndjson",
+}
+COMPRESS_MIN_BYTES = 1024
+COMPRESS_GZIP_LEVEL = int(os.environ.get("SCHOOL_ERP_GZIP_LEVEL", "6"))
+COMPRESS_BROTLI_QUALITY = int(os.environ.get("SCHOOL_ERP_BROTLI_QUALITY", "5"))
+
+
+def _negotiate_encoding():
+    """The content coding to use for this request, or None for identity."""
+    offered = ["br", "gzip"] if brotli is not None else ["gzip"]
+    return request.accept_encodings.best_match(offered)
 
-def get_db_connection():
-    return mysql.connector.connect(**DB_CONFIG)
+
+def _compress_body(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=COMPRESS_GZIP_LEVEL, mtime=0)
+
+
+def _compress_stream(chunks, encoding):
+    """Compress an iterable of body chunks, flushing after each one."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=COMPRESS_BROTLI_QUALITY)
+        compress, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        compressor = zlib.compressobj(COMPRESS_GZIP_LEVEL, zlib.DEFLATED, 31)  # 31: gzip container
+        compress, finish = compressor.compress, compressor.flush
+        flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)  # noqa: E731
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            data = compress(chunk) + flush()
+            if data:
+                yield data
+        yield finish()
+    finally:
+        # Closing the wrapper (e.g. on client disconnect) must still close
+        # the original iterable so exports release their DB connection
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+
+@app.after_request
+def compress_response(response):
+    if (
+        response.mimetype not in COMPRESS_MIMETYPES
+        or response.status_code < 200
+        or response.status_code in (204, 206, 304)
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+        or "no-transform" in response.headers.get("Cache-Control", "")
+    ):
+        return response
+    if not response.is_streamed and response.calculate_content_length() < COMPRESS_MIN_BYTES:
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = _negotiate_encoding()
+    if encoding is None:
+        return response
+    if response.is_streamed:
+        response.response = _compress_stream(response.response, encoding)
+        response.headers.pop("Content-Length", None)
+    else:
+        response.set_data(_compress_body(response.get_data(), encoding))
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+# ---------------- Concurrent queries ----------------
+# Independent read queries (the dashboard's totals and notice feed) can run at
+# the same time on separate pooled connections, so a page waits for the
+# slowest query instead of the sum of all of them. The worker pool is shared
+# and bounded; calls made from inside a worker run inline.
+DB_FANOUT_WORKERS = 4
+
+_fanout_executor = None
+_fanout_executor_lock = threading.Lock()
+_fanout_local = threading.local()
+
+
+def _fanout_task(fn, endpoint, pool):
+    # Count this task's queries separately; the caller merges them into its request
+    _fanout_local.perf = perf = {
+        "start": time.perf_counter(), "connect": 0.0, "connections": 0,
+        "db": 0.0, "queries": 0, "render": 0.0, "endpoint": endpoint,
+    }
+    # Read from the same database (primary or replica) as the request
+    _fanout_local.pool = pool
+    try:
+        return fn(), perf
+    finally:
+        _fanout_local.perf = None
+        _fanout_local.pool = None
+
+
+def run_concurrently(*calls):
+    """Run zero-argument callables concurrently and return their results in order.
+
+    Each call gets its own pooled connection from get_db_connection(), so it
+    must not use the request's connection or flask.g. The first exception is
+    re-raised once every call has finished.
+    """
+    global _fanout_executor
+    if len(calls) < 2 or getattr(_fanout_local, "perf", None) is not None:
+        return [fn() for fn in calls]
+    if _fanout_executor is None:
+        with _fanout_executor_lock:
+            if _fanout_executor is None:
+                _fanout_executor = ThreadPoolExecutor(DB_FANOUT_WORKERS, thread_name_prefix="db-fanout")
+
+    endpoint = request.endpoint if has_request_context() else None
+    pool = read_pool()
+    futures = [_fanout_executor.submit(_fanout_task, fn, endpoint, pool) for fn in calls]
+    results, error = [], None
+    task_perfs = []
+    for future in futures:
+        try:
+            result, perf = future.result()
+            results.append(result)
+            task_perfs.append(perf)
+        except Exception as e:
+            results.append(None)
+            error = error or e
+
+    request_perf = _request_perf()
+    if request_perf is not None and task_perfs:
+        # Connection and query time overlapped, so charge the longest task
+        request_perf["connect"] += max(p["connect"] for p in task_perfs)
+        request_perf["db"] += max(p["db"] for p in task_perfs)
+        request_perf["connections"] += sum(p["connections"] for p in task_perfs)
+        request_perf["queries"] += sum(p["queries"] for p in task_perfs)
+    if error is not None:
+        raise error
+    return results
 
 
 @app.before_request
@@ -29,6 +962,8 @@ def require_login():
     if request.endpoint in allowed_endpoints or request.endpoint is None:
         return
     if "user_id" not in session:
+        if request.path.startswith("/api/"):
+            return jsonify(error="Login required"), 401
         return redirect(url_for("login"))
 
 
@@ -55,6 +990,137 @@ def requires_role(*roles):
     return decorator
 
 
+# ---------------- Password hashing ----------------
+# Method string passed to werkzeug's generate_password_hash, including the work
+# factor. Stored hashes made with any other method still verify and are
+# re-hashed with this one on the user's next successful login. The default is
+# scrypt at half werkzeug's memory cost (16 MiB, roughly half the CPU).
+PASSWORD_HASH_METHOD = os.environ.get("SCHOOL_ERP_PASSWORD_HASH", "scrypt:16384:8:1")
+
+# Hashing runs on a small dedicated pool so a burst of logins can't occupy
+# every request thread; requests beyond workers + queue get a "busy" reply.
+PASSWORD_HASH_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+PASSWORD_HASH_MAX_QUEUED = 32
+PASSWORD_HASH_WAIT = 5  # seconds to wait for a free slot
+
+# Failed logins allowed per window, per username and per client IP, before
+# further attempts are refused without hashing anything.
+LOGIN_FAILURE_WINDOW = 300
+LOGIN_MAX_FAILURES_PER_USER = 5
+LOGIN_MAX_FAILURES_PER_IP = 20
+LOGIN_THROTTLE_MAX_KEYS = 10000
+
+_hash_executor = None
+_hash_executor_lock = threading.Lock()
+_hash_slots = threading.BoundedSemaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUED)
+_hash_prefix = None
+
+_login_failures = collections.OrderedDict()  # key -> deque of failure timestamps
+_login_failures_lock = threading.Lock()
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool and its queue are full."""
+
+
+def _run_hasher(fn, *args):
+    global _hash_executor
+    if not _hash_slots.acquire(timeout=PASSWORD_HASH_WAIT):
+        raise PasswordHasherBusy()
+    try:
+        if _hash_executor is None:
+            with _hash_executor_lock:
+                if _hash_executor is None:
+                    _hash_executor = ThreadPoolExecutor(PASSWORD_HASH_WORKERS, thread_name_prefix="pwhash")
+        return _hash_executor.submit(fn, *args).result()
+    finally:
+        _hash_slots.release()
+
+
+def hash_password(password):
+    return _run_hasher(generate_password_hash, password, PASSWORD_HASH_METHOD)
+
+
+def verify_password(stored_hash, password):
+    return _run_hasher(check_password_hash, stored_hash, password)
+
+
+def _hash_method_prefix():
+    """PASSWORD_HASH_METHOD as werkzeug writes it, with its default parameters filled in."""
+    global _hash_prefix
+    if _hash_prefix is None:
+        # e.g. "pbkdf2:sha256" is stored as "pbkdf2:sha256:1000000"
+        _hash_prefix = hash_password("").split("$", 1)[0]
+    return _hash_prefix
+
+
+def password_needs_rehash(stored_hash):
+    return stored_hash.split("$", 1)[0] != _hash_method_prefix()
+
+
+def _throttle_keys(username):
+    return (
+        (f"user:{(username or '').lower()}", LOGIN_MAX_FAILURES_PER_USER),
+        (f"ip:{request.remote_addr}", LOGIN_MAX_FAILURES_PER_IP),
+    )
+
+
+def login_retry_after(username):
+    """Seconds until this username/IP may try again, or 0 if not throttled."""
+    now = time.monotonic()
+    wait = 0
+    with _login_failures_lock:
+        for key, limit in _throttle_keys(username):
+            failures = _login_failures.get(key)
+            if not failures:
+                continue
+            while failures and failures[0] <= now - LOGIN_FAILURE_WINDOW:
+                failures.popleft()
+            if len(failures) >= limit:
+                wait = max(wait, failures[0] + LOGIN_FAILURE_WINDOW - now)
+    return int(wait) + 1 if wait else 0
+
+
+def record_login_failure(username):
+    now = time.monotonic()
+    with _login_failures_lock:
+        for key, limit in _throttle_keys(username):
+            failures = _login_failures.get(key)
+            if failures is None:
+                failures = _login_failures[key] = collections.deque(maxlen=limit)
+            failures.append(now)
+            _login_failures.move_to_end(key)
+        while len(_login_failures) > LOGIN_THROTTLE_MAX_KEYS:
+            _login_failures.popitem(last=False)
+
+
+def clear_login_failures(username):
+    with _login_failures_lock:
+        _login_failures.pop(_throttle_keys(username)[0][0], None)
+
+
+def upgrade_password_hash(user, password):
+    """Re-hash a just-verified password with PASSWORD_HASH_METHOD if it uses another."""
+    try:
+        if not password_needs_rehash(user["password"]):
+            return
+        new_hash = hash_password(password)
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            # Compare-and-set so a concurrent password change wins
+            cursor.execute(
+                "UPDATE users SET password = %s WHERE id = %s AND password = %s",
+                (new_hash, user["id"], user["password"]),
+            )
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+    except (mysql.connector.Error, PasswordHasherBusy) as e:
+        app.logger.warning("Password hash upgrade for user %s skipped: %s", user["id"], e)
+
+
 @app.route("/signup", methods=["GET", "POST"])
 def signup():
     if "user_id" in session:
@@ -68,7 +1134,11 @@ def signup():
             role = "teacher"
 
         # Hash the password before storing it
-        hashed = generate_password_hash(password)
+        try:
+            hashed = hash_password(password)
+        except PasswordHasherBusy:
+            flash("The server is busy. Please try again in a moment.", "danger")
+            return render_template("signup.html"), 503
 
         try:
             conn = get_db_connection()
@@ -108,6 +1178,11 @@ def login():
         if role not in ("student", "teacher"):
             role = "student"
 
+        retry_after = login_retry_after(username)
+        if retry_after:
+            flash(f"Too many failed login attempts. Try again in {retry_after} seconds.", "danger")
+            return render_template("login.html"), 429, {"Retry-After": str(retry_after)}
+
         try:
             conn = get_db_connection()
         except mysql.connector.Error as e:
@@ -130,13 +1205,22 @@ def login():
             cursor.close()
             conn.close()
 
-        if user and check_password_hash(user["password"], password):
+        try:
+            valid = bool(user) and verify_password(user["password"], password)
+        except PasswordHasherBusy:
+            flash("The server is busy. Please try again in a moment.", "danger")
+            return render_template("login.html"), 503
+
+        if valid:
+            clear_login_failures(username)
+            upgrade_password_hash(user, password)
             session["user_id"] = user["id"]
             session["username"] = user["username"]
             session["role"] = user.get("role")
             flash("Logged in successfully", "success")
             return redirect(url_for("index"))
         else:
+            record_login_failure(username)
             flash("Invalid username, role, or password", "danger")
 
     return render_template("login.html")
@@ -149,20 +1233,70 @@ def logout():
     return redirect(url_for("login"))
 
 
+# Endpoints whose pages never show the notices bell (public pages and auth forms)
+NOTICE_FEED_SKIP_ENDPOINTS = ("login", "signup", "home_page", "teams", "contact", "about", "static")
+
+# Seconds a cached notice feed is trusted. Writes in this process invalidate it
+# immediately; the TTL only matters for writes made by other workers.
+RECENT_NOTICES_TTL = 60
+
+_recent_notices_cache = {"rows": None, "expires": 0.0, "generation": 0}
+_recent_notices_lock = threading.Lock()
+
+
+def invalidate_recent_notices():
+    """Drop the cached header notice feed; call after any notices write."""
+    with _recent_notices_lock:
+        _recent_notices_cache["rows"] = None
+        _recent_notices_cache["generation"] += 1
+
+
+def get_recent_notices():
+    """Return the five most recent notices, served from cache when fresh."""
+    with _recent_notices_lock:
+        rows = _recent_notices_cache["rows"]
+        if rows is not None and time.monotonic() < _recent_notices_cache["expires"]:
+            return rows
+        generation = _recent_notices_cache["generation"]
+
+    conn = get_db_connection(read_only=True)
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(
+        "SELECT id, title, created_at FROM notices ORDER BY created_at DESC, id DESC LIMIT 5"
+    )
+    rows = cursor.fetchall()
+    cursor.close()
+    conn.close()
+
+    with _recent_notices_lock:
+        # Don't store a result that raced with an invalidation
+        if _recent_notices_cache["generation"] == generation:
+            _recent_notices_cache["rows"] = rows
+            _recent_notices_cache["expires"] = time.monotonic() + RECENT_NOTICES_TTL
+    return rows
+
+
+def _recent_notices_or_empty():
+    """get_recent_notices(), but an empty feed rather than an error."""
+    try:
+        return get_recent_notices()
+    except Exception as e:
+        app.logger.error("Recent notices feed failed", exc_info=e)
+        return []
+
+
 @app.context_processor
 def inject_recent_notices():
     """Provide a few recent notices to all templates for the header dropdown."""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute(
-            "SELECT id, title, created_at FROM notices ORDER BY created_at DESC, id DESC LIMIT 5"
-        )
-        recent_notices = cursor.fetchall()
-        cursor.close()
-        conn.close()
-    except Exception:
-        recent_notices = []
+    recent_notices = []
+    if "user_id" in session and request.endpoint not in NOTICE_FEED_SKIP_ENDPOINTS:
+        try:
+            # Pages that fetch the feed alongside their own queries leave it on g
+            recent_notices = g.get("recent_notices")
+            if recent_notices is None:
+                recent_notices = get_recent_notices()
+        except Exception:
+            recent_notices = []
 
     return dict(recent_notices=recent_notices, current_year=datetime.datetime.now().year)
 
@@ -179,12 +1313,12 @@ def create_default_users():
     cursor = conn.cursor()
     try:
         cursor.execute(
-            "INSERT IGNORE INTO users (username, password, role) VALUES (%s, %s, %s)",
-            ("admin", generate_password_hash("admin123"), "teacher"),
+            f"{sql_insert_ignore()} INTO users (username, password, role) VALUES (%s, %s, %s)",
+            ("admin", generate_password_hash("admin123", PASSWORD_HASH_METHOD), "teacher"),
         )
         cursor.execute(
-            "INSERT IGNORE INTO users (username, password, role) VALUES (%s, %s, %s)",
-            ("student1", generate_password_hash("student123"), "student"),
+            f"{sql_insert_ignore()} INTO users (username, password, role) VALUES (%s, %s, %s)",
+            ("student1", generate_password_hash("student123", PASSWORD_HASH_METHOD), "student"),
         )
         conn.commit()
         click.echo("Default users created: admin/admin123, student1/student123")
@@ -227,15 +1361,56 @@ def health():
     except Exception as e:
         app.logger.error('Health DB check failed', exc_info=e)
         data['db'] = f'error: {str(e)}'
+    data['pool'] = get_db_pool().stats()
+    if DB_REPLICAS:
+        data['replicas'] = [replica.stats() for replica in get_replicas()]
+    data['fragment_cache'] = fragment_cache.stats()
+    if ATTENDANCE_GROUP_COMMIT:
+        data['attendance_writes'] = attendance_write_buffer.stats()
     return jsonify(data)
 
 
+@app.cli.command('startup-time')
+@click.option('--runs', default=5, show_default=True, help='Cold imports to measure.')
+def startup_time_command(runs):
+    """Measure a cold `import app` against IMPORT_TIME_BUDGET_MS."""
+    code = (
+        "import time; t = time.perf_counter(); import app; "
+        "print((time.perf_counter() - t) * 1000)"
+    )
+    timings = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True,
+        )
+        timings.append(float(out.stdout.strip().splitlines()[-1]))
+    timings.sort()
+    median = timings[len(timings) // 2]
+    click.echo(f"import app: median {median:.1f} ms, min {timings[0]:.1f} ms, max {timings[-1]:.1f} ms "
+               f"(budget {IMPORT_TIME_BUDGET_MS} ms)")
+    if median > IMPORT_TIME_BUDGET_MS:
+        raise click.ClickException("import time over budget")
+
+
+@app.cli.command('pool-stats')
+def pool_stats_command():
+    """Show connection pool statistics for this process."""
+    for key, value in sorted(get_db_pool().stats().items()):
+        click.echo(f"{key}: {value}")
+
+
 def ensure_users_role_column():
-    """Ensure the `users.role` column exists; add it if missing."""
+    """Ensure the `users.role` column exists; add it if missing. Raises on DB errors."""
+    # Schema changes go to the primary, even when this request reads from a replica
+    conn = get_db_pool().connect()
+    cursor = conn.cursor()
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SHOW COLUMNS FROM users LIKE 'role'")
+        if DB_BACKEND == "sqlite":
+            cursor.execute("SELECT name FROM pragma_table_info('users') WHERE name = 'role'")
+        else:
+            cursor.execute("SHOW COLUMNS FROM users LIKE 'role'")
         if cursor.fetchone() is None:
             app.logger.info("'role' column not found on users table — adding it now")
             # Use IF NOT EXISTS to be safe on compatible MySQL versions
@@ -246,10 +1421,9 @@ def ensure_users_role_column():
                 cursor.execute("ALTER TABLE users ADD COLUMN role VARCHAR(20) NOT NULL DEFAULT 'teacher'")
             conn.commit()
             app.logger.info("Added 'role' column to users table")
+    finally:
         cursor.close()
         conn.close()
-    except Exception as e:
-        app.logger.error("Schema migration error", exc_info=e)
 
 
 def test_db_connection():
@@ -269,12 +1443,24 @@ def init_db_from_schema(schema_path: str = None):
     """Initialize the database by executing the SQL in schema.sql.
 
     This connects to the MySQL server (without selecting a database) and executes
-    each statement in the schema file. Returns (ok: bool, message: str).
+    each statement in the schema file. With the SQLite backend schema.sqlite.sql
+    is run against SQLITE_PATH instead. Returns (ok: bool, message: str).
     """
-    schema_file = schema_path or os.path.join(Path(__file__).parent, 'schema.sql')
+    default_schema = 'schema.sqlite.sql' if DB_BACKEND == 'sqlite' else 'schema.sql'
+    schema_file = schema_path or os.path.join(Path(__file__).parent, default_schema)
     if not os.path.exists(schema_file):
         return False, f"Schema file not found: {schema_file}"
 
+    if DB_BACKEND == 'sqlite':
+        try:
+            conn = SQLiteConnection(SQLITE_PATH)
+            with open(schema_file, 'r', encoding='utf-8') as f:
+                conn.executescript(f.read())
+            conn.close()
+            return True, 'Schema executed'
+        except Exception as e:
+            return False, str(e)
+
     # Connect to server without specifying database so CREATE DATABASE works
     config_without_db = dict(DB_CONFIG)
     config_without_db.pop('database', None)
@@ -303,56 +1489,618 @@ def init_db_from_schema(schema_path: str = None):
 
 @app.cli.command('init-db')
 def init_db_command():
-    """Initialize the database by applying schema.sql."""
+    """Initialize the database by applying schema.sql and all migrations."""
     ok, msg = init_db_from_schema()
     if ok:
         click.echo('Schema applied successfully.')
     else:
         click.echo(f'Failed to apply schema: {msg}')
+        return
+    try:
+        for version, name in upgrade_db():
+            click.echo(f'Applied migration {version:04d} {name}')
+    except (mysql.connector.Error, MigrationError) as e:
+        click.echo(f'Migration failed: {e}')
 
 
+# ---------------- Table versions & conditional responses ----------------
+# table_versions holds a counter per table that every write route bumps in its
+# own transaction. Readers compare versions instead of re-running queries.
+# Chart JSON may be stored by browsers/proxies but must be revalidated each
+# time, which costs one primary-key lookup and usually ends in a 304.
+CHART_CACHE_CONTROL = "public, no-cache"
 
-# Run migrations at startup (best-effort)
-try:
-    ensure_users_role_column()
-except Exception as e:
-    app.logger.error("Failed running migrations at startup", exc_info=e)
 
+def bump_table_version(cursor, table):
+    """Mark `table` as changed inside the caller's open transaction."""
+    note_db_write()
+    cursor.execute(
+        "UPDATE table_versions SET version = version + 1, updated_at = %s WHERE table_name = %s",
+        (datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None, microsecond=0), table),
+    )
 
-@app.route("/")
-def index():
-    # Public landing page for unauthenticated visitors
-    if "user_id" not in session:
-        return render_template("landing.html")
 
+def get_table_versions(tables):
+    """Return {table: (version, updated_at)} for the given tables."""
     conn = get_db_connection()
     cursor = conn.cursor()
+    placeholders = ", ".join(["%s"] * len(tables))
+    cursor.execute(
+        f"SELECT table_name, version, updated_at FROM table_versions WHERE table_name IN ({placeholders})",
+        tuple(tables),
+    )
+    versions = {name: (version, updated_at) for name, version, updated_at in cursor.fetchall()}
+    cursor.close()
+    conn.close()
+    return versions
 
-    cursor.execute("SELECT COUNT(*) FROM students")
-    total_students = cursor.fetchone()[0]
-
-    cursor.execute("SELECT COUNT(*) FROM teachers")
-    total_teachers = cursor.fetchone()[0]
 
-    cursor.execute("SELECT COUNT(*) FROM classes")
-    total_classes = cursor.fetchone()[0]
+def conditional_on_tables(*tables):
+    """Decorator: send ETag/Last-Modified derived from `tables`' versions.
 
-    cursor.execute("SELECT COUNT(*) FROM attendance")
-    total_attendance = cursor.fetchone()[0]
+    A request whose If-None-Match (or If-Modified-Since) still matches gets a
+    304 without the view running at all. The ETag also covers the query
+    string, since filtered responses differ.
+    """
+    from functools import wraps
 
-    cursor.execute("SELECT COUNT(*) FROM notices")
-    total_notices = cursor.fetchone()[0]
+    def decorator(f):
+        @wraps(f)
+        def wrapped(*args, **kwargs):
+            try:
+                versions = get_table_versions(tables)
+            except mysql.connector.Error as e:
+                app.logger.warning("table_versions unavailable, skipping validators: %s", e)
+                versions = {}
+            if len(versions) != len(tables):
+                return f(*args, **kwargs)
+
+            key = repr((sorted((t, v) for t, (v, _) in versions.items()), sorted(request.args.items(multi=True))))
+            etag = hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+            last_modified = max(updated_at for _, updated_at in versions.values())
+            # updated_at has one-second precision, so while its second is still
+            # running another write could land with the same stamp. Only offer
+            # Last-Modified (and honour If-Modified-Since) once it has passed.
+            now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+            if now - last_modified < datetime.timedelta(seconds=1):
+                last_modified = None
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                since = request.if_modified_since
+                not_modified = (since is not None and last_modified is not None
+                                and since.replace(tzinfo=None) >= last_modified)
+
+            response = app.make_response(("", 304) if not_modified else f(*args, **kwargs))
+            if response.status_code in (200, 304):
+                # Weak: the gzip, brotli and identity encodings share it
+                response.set_etag(etag, weak=True)
+                if last_modified is not None:
+                    response.last_modified = last_modified
+                response.headers["Cache-Control"] = CHART_CACHE_CONTROL
+                response.vary.add("Cookie")
+            return response
+
+        return wrapped
+
+    return decorator
+
+
+# ---------------- Static assets ----------------
+# `flask vendor-assets` downloads the third-party CSS, fonts and Chart.js that
+# pages used to pull from CDNs into static/vendor/, so pages work without
+# internet access. `flask build-assets` copies every static file into
+# static/dist/ under a content-hashed name, with gzip/brotli variants next to
+# the text files, and writes a manifest. url_for('static', ...) then returns
+# the hashed name, served with a one-year immutable Cache-Control. Without a
+# build, plain /static URLs are used as before.
+STATIC_DIST_DIR = "dist"
+STATIC_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+PRECOMPRESS_EXTENSIONS = (".css", ".js", ".svg", ".json", ".map", ".txt")
+PRECOMPRESS_MIN_BYTES = 512
+
+CHART_JS_VERSION = "4.4.1"
+BOOTSTRAP_ICONS_VERSION = "1.10.5"
+_JSDELIVR = "https://cdn.jsdelivr.net/npm"
+
+# static/vendor/ path -> download URL
+VENDOR_ASSETS = {
+    "chart.umd.js": f"{_JSDELIVR}/chart.js@{CHART_JS_VERSION}/dist/chart.umd.js",
+    "bootstrap-icons/bootstrap-icons.css": f"{_JSDELIVR}/bootstrap-icons@{BOOTSTRAP_ICONS_VERSION}/font/bootstrap-icons.css",
+    "bootstrap-icons/fonts/bootstrap-icons.woff2": f"{_JSDELIVR}/bootstrap-icons@{BOOTSTRAP_ICONS_VERSION}/font/fonts/bootstrap-icons.woff2",
+    "bootstrap-icons/fonts/bootstrap-icons.woff": f"{_JSDELIVR}/bootstrap-icons@{BOOTSTRAP_ICONS_VERSION}/font/fonts/bootstrap-icons.woff",
+}
+# Web fonts for vendor/fonts.css: family -> (fontsource package, weights)
+VENDOR_FONTS = {
+    "Space Grotesk": ("space-grotesk", (400, 600, 700)),
+    "Rubik": ("rubik", (400, 500, 700)),
+}
+# What the templates load until `flask vendor-assets` has been run
+VENDOR_FALLBACK_URLS = {
+    "chart.umd.js": f"{_JSDELIVR}/chart.js@{CHART_JS_VERSION}/dist/chart.umd.js",
+    "fonts.css": "https://fonts.googleapis.com/css2?family=Space+Grotesk:wght@400;600;700&family=Rubik:wght@400;500;700&display=swap",
+    "bootstrap-icons/bootstrap-icons.css": VENDOR_ASSETS["bootstrap-icons/bootstrap-icons.css"],
+}
+
+_static_manifest = None  # (manifest.json mtime or None if missing, manifest)
+_CSS_URL_RE = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+
+
+def static_manifest():
+    """{source path: hashed path} from the last `flask build-assets`, or {}.
+
+    Reloaded whenever manifest.json changes, so a build that finishes after
+    startup is picked up without a restart.
+    """
+    global _static_manifest
+    path = os.path.join(app.static_folder, STATIC_DIST_DIR, "manifest.json")
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        mtime = None
+    if _static_manifest is not None and _static_manifest[0] == mtime:
+        return _static_manifest[1]
+    manifest = {}
+    if mtime is None:
+        app.logger.warning("No static manifest at %s, serving unfingerprinted URLs (run `flask build-assets`)", path)
+    else:
+        try:
+            with open(path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            app.logger.warning("Static manifest %s unreadable, serving unfingerprinted URLs: %s", path, e)
+    _static_manifest = (mtime, manifest)
+    return manifest
 
-    cursor.close()
-    conn.close()
+
+@app.url_defaults
+def fingerprint_static_url(endpoint, values):
+    if endpoint == "static" and "filename" in values:
+        hashed = static_manifest().get(values["filename"])
+        if hashed:
+            values["filename"] = f"{STATIC_DIST_DIR}/{hashed}"
+
+
+def vendor_url(path):
+    """URL of a vendored asset, or its CDN original if it hasn't been vendored."""
+    filename = f"vendor/{path}"
+    if filename in static_manifest() or os.path.isfile(os.path.join(app.static_folder, filename)):
+        return url_for("static", filename=filename)
+    return VENDOR_FALLBACK_URLS[path]
+
+
+@app.context_processor
+def inject_asset_helpers():
+    return dict(vendor_url=vendor_url)
+
+
+def _send_precompressed(filename):
+    """Serve filename.br / filename.gz if the client accepts it and one exists."""
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+        if not request.accept_encodings[encoding]:
+            continue
+        path = safe_join(app.static_folder, filename + suffix)
+        if path and os.path.isfile(path):
+            response = send_from_directory(app.static_folder, filename + suffix, mimetype=mimetype)
+            response.headers["Content-Encoding"] = encoding
+            return response
+    return None
+
+
+def serve_static(filename):
+    """Flask's static view, plus precompressed variants and immutable caching for dist/."""
+    if not filename.startswith(STATIC_DIST_DIR + "/"):
+        return app.send_static_file(filename)
+    response = _send_precompressed(filename) or app.send_static_file(filename)
+    response.vary.add("Accept-Encoding")
+    response.cache_control.no_cache = None
+    response.cache_control.public = True
+    response.cache_control.max_age = STATIC_IMMUTABLE_MAX_AGE
+    response.cache_control.immutable = True
+    return response
+
+
+app.view_functions["static"] = serve_static
+
+
+def _rewrite_css_urls(css, css_path, manifest):
+    """Point relative url(...) references in a stylesheet at hashed names."""
+    base = posixpath.dirname(css_path)
+
+    def replace(match):
+        ref = match.group(2).strip()
+        if ref.startswith(("data:", "http:", "https:", "//", "#", "/")):
+            return match.group(0)
+        target = posixpath.normpath(posixpath.join(base, re.split(r"[?#]", ref, 1)[0]))
+        if target not in manifest:
+            return match.group(0)
+        return f'url("{posixpath.relpath(manifest[target], base or ".")}")'
+
+    return _CSS_URL_RE.sub(replace, css)
+
+
+def build_static_assets():
+    """Write static/dist/ and its manifest. Returns (files, compressed variants)."""
+    global _static_manifest
+    static_root = Path(app.static_folder)
+    dist = static_root / STATIC_DIST_DIR
+    if dist.exists():
+        shutil.rmtree(dist)
+    sources = [
+        p for p in static_root.rglob("*")
+        if p.is_file() and dist not in p.parents and not p.name.startswith(".")
+    ]
+    manifest, variants = {}, 0
+    # Stylesheets last, so their url() references can use hashed names
+    for path in sorted(sources, key=lambda p: (p.suffix == ".css", p.as_posix())):
+        rel = path.relative_to(static_root).as_posix()
+        data = path.read_bytes()
+        if path.suffix == ".css":
+            data = _rewrite_css_urls(data.decode("utf-8"), rel, manifest).encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        hashed = posixpath.join(posixpath.dirname(rel), f"{path.stem}.{digest}{path.suffix}")
+        out = dist / hashed
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_bytes(data)
+        manifest[rel] = hashed
+
+        if path.suffix in PRECOMPRESS_EXTENSIONS and len(data) >= PRECOMPRESS_MIN_BYTES:
+            out.with_name(out.name + ".gz").write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+            variants += 1
+            if brotli is not None:
+                out.with_name(out.name + ".br").write_bytes(brotli.compress(data, quality=11))
+                variants += 1
+
+    manifest_path = dist / "manifest.json"
+    manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    _static_manifest = (manifest_path.stat().st_mtime_ns, manifest)
+    return len(manifest), variants
+
+
+def vendor_static_assets():
+    """Download VENDOR_ASSETS and VENDOR_FONTS into static/vendor/. Returns paths written."""
+    vendor = Path(app.static_folder) / "vendor"
+    downloads = dict(VENDOR_ASSETS)
+    font_faces = []
+    for family, (package, weights) in VENDOR_FONTS.items():
+        for weight in weights:
+            name = f"fonts/{package}-latin-{weight}-normal.woff2"
+            downloads[name] = f"{_JSDELIVR}/@fontsource/{package}/files/{package}-latin-{weight}-normal.woff2"
+            font_faces.append(
+                "@font-face {\n"
+                f"  font-family: '{family}';\n  font-style: normal;\n  font-weight: {weight};\n"
+                f"  font-display: swap;\n  src: url('{name}') format('woff2');\n}}\n"
+            )
+
+    written = []
+    for rel, url in downloads.items():
+        target = vendor / rel
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with urllib.request.urlopen(url, timeout=30) as response:
+            target.write_bytes(response.read())
+        written.append(rel)
+    (vendor / "fonts.css").write_text("\n".join(font_faces), encoding="utf-8")
+    written.append("fonts.css")
+    return written
+
+
+@app.cli.command('vendor-assets')
+def vendor_assets_command():
+    """Download Chart.js, the web fonts and the icon font into static/vendor/."""
+    try:
+        written = vendor_static_assets()
+    except OSError as e:
+        click.echo(f"Download failed: {e}")
+        return
+    for rel in written:
+        click.echo(f"static/vendor/{rel}")
+
+
+@app.cli.command('build-assets')
+def build_assets_command():
+    """Fingerprint and precompress static files into static/dist/."""
+    files, variants = build_static_assets()
+    click.echo(f"{files} files fingerprinted, {variants} precompressed variants written")
+    if brotli is None:
+        click.echo("brotli is not installed; only gzip variants were written")
+
+
+# ---------------- Schema migrations ----------------
+# Numbered files in migrations/ (e.g. 0003_attendance_indexes.sql) are applied
+# in order, once each, and recorded in the schema_migrations table.
+MIGRATIONS_DIR = os.path.join(Path(__file__).parent, 'migrations')
+
+# MySQL error codes meaning a statement's change is already in place (table
+# exists, duplicate column, duplicate index name). Skipping them lets a
+# migration that was interrupted part-way simply be re-run.
+_ALREADY_APPLIED_ERRNOS = (1050, 1060, 1061)
+
+
+class MigrationError(Exception):
+    pass
+
+
+def _split_sql(sql):
+    """Split a SQL script into statements, dropping `--` comment lines."""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith('--')]
+    return [s.strip() for s in '\n'.join(lines).split(';') if s.strip()]
+
+
+def list_migrations():
+    """Return [(version, name, path)] for every migration file, oldest first.
+
+    A file named NNNN_name.<backend>.sql replaces NNNN_name.sql when
+    DB_BACKEND is <backend>; files for other backends are ignored.
+    """
+    migrations = {}
+    if not os.path.isdir(MIGRATIONS_DIR):
+        return []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        stem, ext = os.path.splitext(filename)
+        stem, _, dialect = stem.partition('.')
+        number, _, name = stem.partition('_')
+        if ext != '.sql' or not number.isdigit() or dialect not in ('', DB_BACKEND):
+            continue
+        version = int(number)
+        if version in migrations and bool(migrations[version][3]) == bool(dialect):
+            raise MigrationError(f'Duplicate migration numbers in {MIGRATIONS_DIR}')
+        if version not in migrations or dialect:
+            migrations[version] = (version, name, os.path.join(MIGRATIONS_DIR, filename), dialect)
+    return [m[:3] for _, m in sorted(migrations.items())]
+
+
+def applied_migrations(cursor):
+    """Return {version: applied_at}, creating the tracking table if needed."""
+    cursor.execute(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        " version INT PRIMARY KEY,"
+        " name VARCHAR(255) NOT NULL,"
+        " applied_at DATETIME NOT NULL)"
+    )
+    cursor.execute("SELECT version, applied_at FROM schema_migrations")
+    return {version: applied_at for version, applied_at in cursor.fetchall()}
+
+
+def upgrade_db(target=None):
+    """Apply pending migrations up to `target` (default: all).
+
+    Returns [(version, name)] of the migrations applied. Stops at the first
+    failing statement; MySQL DDL is not transactional, so anything before it
+    stays applied and the migration is retried on the next upgrade. Existing
+    records are indexed for /search if the search index is still empty.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    done = []
+    try:
+        applied = applied_migrations(cursor)
+        for version, name, path in list_migrations():
+            if version in applied or (target is not None and version > target):
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                statements = _split_sql(f.read())
+            for stmt in statements:
+                try:
+                    cursor.execute(stmt)
+                except mysql.connector.Error as e:
+                    if e.errno not in _ALREADY_APPLIED_ERRNOS:
+                        conn.rollback()
+                        raise MigrationError(f'{version:04d}_{name}: {e}') from e
+                    app.logger.info('Migration %04d: already applied, skipping: %s', version, stmt[:80])
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, name, applied_at) VALUES (%s, %s, %s)",
+                (version, name, datetime.datetime.now()),
+            )
+            conn.commit()
+            done.append((version, name))
+    finally:
+        cursor.close()
+        conn.close()
+    if search_index_missing():
+        counts = rebuild_search_index()
+        app.logger.info("Indexed existing records for search: %s", counts)
+    return done
+
+
+@app.cli.group('db')
+def db_cli():
+    """Versioned schema migrations."""
+
+
+@db_cli.command('upgrade')
+@click.option('--to', 'target', type=int, default=None, help='Stop after this migration number.')
+def db_upgrade_command(target):
+    """Apply pending migrations from migrations/."""
+    try:
+        done = upgrade_db(target)
+    except (mysql.connector.Error, MigrationError) as e:
+        click.echo(f'Migration failed: {e}')
+        return
+    for version, name in done:
+        click.echo(f'Applied migration {version:04d} {name}')
+    if not done:
+        click.echo('Database is up to date.')
+
+
+@db_cli.command('status')
+def db_status_command():
+    """List migrations and whether each has been applied."""
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        applied = applied_migrations(cursor)
+        cursor.close()
+        conn.close()
+        migrations = list_migrations()
+    except (mysql.connector.Error, MigrationError) as e:
+        click.echo(f'DB error: {e}')
+        return
+    for version, name, _ in migrations:
+        when = applied.get(version)
+        state = f'applied {when}' if when else 'pending'
+        click.echo(f'{version:04d} {name:<30} {state}')
+
+
+
+# ---------------- Dashboard counters ----------------
+# Row totals shown on the dashboard are kept in `entity_counters` and adjusted
+# in the same transaction as every insert/delete, so the dashboard never has
+# to COUNT(*) the (large) underlying tables.
+COUNTED_TABLES = ("students", "teachers", "classes", "attendance", "notices")
+
+
+def bump_counter(cursor, entity, delta):
+    """Adjust an entity total inside the caller's open transaction."""
+    cursor.execute(
+        "UPDATE entity_counters SET total = total + %s WHERE entity = %s",
+        (delta, entity),
+    )
+
+
+def load_entity_totals(cursor):
+    """Return {table: row_count} for COUNTED_TABLES in one primary-key lookup.
+
+    Any table missing from entity_counters (or the whole table, on databases
+    that haven't been upgraded yet) falls back to a COUNT(*).
+    """
+    return complete_entity_totals(read_entity_counters(cursor))
+
+
+def read_entity_counters(cursor):
+    try:
+        cursor.execute("SELECT entity, total FROM entity_counters")
+        return {entity: int(total) for entity, total in cursor.fetchall()}
+    except mysql.connector.Error as e:
+        app.logger.warning("entity_counters unavailable, falling back to COUNT(*): %s", e)
+        return {}
+
+
+def complete_entity_totals(totals):
+    """Fill in COUNTED_TABLES missing from `totals`, counting them concurrently."""
+    missing = [table for table in COUNTED_TABLES if table not in totals]
+    counts = run_concurrently(*[lambda table=table: count_rows(table) for table in missing])
+    return {**totals, **dict(zip(missing, counts))}
+
+
+def count_rows(table):
+    """COUNT(*) of `table` on a connection of its own (safe in run_concurrently)."""
+    conn = (getattr(_fanout_local, "pool", None) or read_pool()).connect()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"SELECT COUNT(*) FROM {table}")
+        return cursor.fetchone()[0]
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def load_dashboard_counters():
+    """read_entity_counters() on a connection of its own (safe in run_concurrently)."""
+    conn = (getattr(_fanout_local, "pool", None) or read_pool()).connect()
+    cursor = conn.cursor()
+    try:
+        return read_entity_counters(cursor)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def rebuild_counters():
+    """Recompute every entity total from the real tables. Returns the totals."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    totals = {}
+    try:
+        cursor.execute(
+            "CREATE TABLE IF NOT EXISTS entity_counters ("
+            " entity VARCHAR(32) PRIMARY KEY,"
+            " total BIGINT NOT NULL DEFAULT 0)"
+        )
+        begin_write(conn)
+        for table in COUNTED_TABLES:
+            # Lock the source rows so concurrent inserts can't slip between
+            # the count and the write
+            cursor.execute(f"SELECT COUNT(*) FROM {table}{sql_for_update()}")
+            totals[table] = cursor.fetchone()[0]
+            cursor.execute(
+                "REPLACE INTO entity_counters (entity, total) VALUES (%s, %s)",
+                (table, totals[table]),
+            )
+        conn.commit()
+    except mysql.connector.Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+    return totals
+
+
+@app.cli.command('rebuild-counters')
+def rebuild_counters_command():
+    """Recompute the dashboard totals in entity_counters from scratch."""
+    try:
+        totals = rebuild_counters()
+    except mysql.connector.Error as e:
+        click.echo(f"DB error: {e}")
+        return
+    for table, total in totals.items():
+        click.echo(f"{table}: {total}")
+
+
+# Schema fix-ups run once per process on the first request rather than at
+# import time, so workers and `flask` commands start without touching the DB.
+# `flask db upgrade` is the proper way to bring a database up to date. If the
+# database can't be reached the check is retried after STARTUP_CHECK_RETRY
+# seconds; requests arriving meanwhile don't wait for it.
+STARTUP_CHECK_RETRY = 30
+
+_startup_checks_done = False
+_startup_checks_next_try = 0.0
+_startup_checks_lock = threading.Lock()
+
+
+@app.before_request
+def run_startup_checks_once():
+    global _startup_checks_done, _startup_checks_next_try
+    if _startup_checks_done or time.monotonic() < _startup_checks_next_try:
+        return
+    # One request runs the check; the others carry on instead of queueing
+    if not _startup_checks_lock.acquire(blocking=False):
+        return
+    try:
+        if _startup_checks_done:
+            return
+        try:
+            ensure_users_role_column()
+            _startup_checks_done = True
+        except Exception as e:
+            app.logger.error("Failed running startup schema checks", exc_info=e)
+            _startup_checks_next_try = time.monotonic() + STARTUP_CHECK_RETRY
+    finally:
+        _startup_checks_lock.release()
+
+
+@app.route("/")
+@reads_from_replica
+def index():
+    # Public landing page for unauthenticated visitors
+    if "user_id" not in session:
+        return render_template("landing.html")
+
+    # The totals and the header notice feed are independent: fetch them together
+    counters, g.recent_notices = run_concurrently(load_dashboard_counters, _recent_notices_or_empty)
+    totals = complete_entity_totals(counters)
 
     return render_template(
         "index.html",
-        total_students=total_students,
-        total_teachers=total_teachers,
-        total_classes=total_classes,
-        total_attendance=total_attendance,
-        total_notices=total_notices,
+        total_students=totals["students"],
+        total_teachers=totals["teachers"],
+        total_classes=totals["classes"],
+        total_attendance=totals["attendance"],
+        total_notices=totals["notices"],
     )
 
 
@@ -372,16 +2120,613 @@ def contact():
     return render_template('contact.html')
 
 
-# ---------------- Students CRUD ----------------
-@app.route("/students")
-def students_list():
+# ---------------- List pagination & filters ----------------
+# List pages use keyset ("seek") pagination: instead of OFFSET, each page asks
+# for rows that sort after the last row of the previous page, so page N costs
+# the same as page 1. The `after` query arg carries that last row's sort key.
+LIST_PAGE_SIZE = 50
+LIST_MAX_PAGE_SIZE = 200
+
+
+def _parse_date(value):
+    return datetime.date.fromisoformat(str(value))
+
+
+def _list_page_size():
+    size = request.args.get("per_page", LIST_PAGE_SIZE, type=int)
+    return max(1, min(size, LIST_MAX_PAGE_SIZE))
+
+
+def _like_prefix(value):
+    """Escape LIKE wildcards in user input and anchor it as a prefix match.
+
+    Uses '!' as the escape character (see add_prefix_filter) because MySQL and
+    SQLite disagree about backslashes.
+    """
+    escaped = value.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+    return escaped + "%"
+
+
+def add_equals_filter(filters, params, column, arg, type=str):
+    value = request.args.get(arg, type=type)
+    if isinstance(value, str):
+        value = value.strip()
+    if value not in (None, ""):
+        filters.append(f"{column} = %s")
+        params.append(value)
+
+
+def add_prefix_filter(filters, params, column, arg="name"):
+    value = request.args.get(arg, "").strip()
+    if value:
+        filters.append(f"{column} LIKE %s ESCAPE '!'")
+        params.append(_like_prefix(value))
+
+
+def add_date_range_filter(filters, params, column):
+    for arg, op in (("date_from", ">="), ("date_to", "<=")):
+        try:
+            value = _parse_date(request.args.get(arg, ""))
+        except ValueError:
+            continue
+        filters.append(f"{column} {op} %s")
+        params.append(value)
+
+
+def fetch_keyset_page(cursor, select_sql, filters, params, sort_key):
+    """Fetch one page of a list ordered DESC by `sort_key`.
+
+    `select_sql` is everything up to (not including) WHERE. `sort_key` is a
+    list of (sql_column, row_key, parser) tuples matching the ORDER BY, ending
+    with a unique column (the id) so the order is total. Returns (rows, page)
+    where `page` is the pagination context for the `_pager.html` template.
+    """
+    page_size = _list_page_size()
+    filters, params = list(filters), list(params)
+
+    after = request.args.get("after", "")
+    after_values = None
+    if after:
+        parts = after.split(",")
+        try:
+            if len(parts) == len(sort_key):
+                after_values = [parse(part) for part, (_, _, parse) in zip(parts, sort_key)]
+        except ValueError:
+            after_values = None
+
+    if after_values is not None:
+        # (c1, c2, ...) < (v1, v2, ...) spelled out so MySQL can use a range scan
+        clauses = []
+        for i, (column, _, _) in enumerate(sort_key):
+            equal = [f"{prev} = %s" for prev, _, _ in sort_key[:i]]
+            clauses.append("(" + " AND ".join(equal + [f"{column} < %s"]) + ")")
+            params.extend(after_values[: i + 1])
+        filters.append("(" + " OR ".join(clauses) + ")")
+
+    sql = select_sql
+    if filters:
+        sql += " WHERE " + " AND ".join(filters)
+    sql += " ORDER BY " + ", ".join(f"{column} DESC" for column, _, _ in sort_key)
+    sql += " LIMIT %s"
+    params.append(page_size + 1)
+
+    cursor.execute(sql, params)
+    rows = cursor.fetchall()
+
+    next_after = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_after = ",".join(str(last[key]) for _, key, _ in sort_key)
+
+    page = {
+        "per_page": page_size,
+        "is_first": after_values is None,
+        "next_after": next_after,
+        "args": {k: v for k, v in request.args.items() if k != "after" and v},
+    }
+    return rows, page
+
+
+ID_SORT = [("id", "id", int)]
+
+
+# ---------------- List fragment cache ----------------
+# The rendered <tbody> of each list page is cached per process, keyed by the
+# endpoint, the query string, the viewer's role (the action buttons differ)
+# and the table_versions of every table the rows come from. A write bumps a
+# version, so old entries are never served again and age out of the LRU.
+FRAGMENT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+
+class FragmentCache:
+    """Thread-safe LRU of rendered fragments, bounded by total size."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = collections.OrderedDict()  # key -> (value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[0]
+
+    def set(self, key, value, size):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), bytes=self._bytes, max_bytes=self.max_bytes)
+
+
+fragment_cache = FragmentCache(FRAGMENT_CACHE_MAX_BYTES)
+
+
+def keyset_loader(select_sql, filters, params, sort_key):
+    """Defer a fetch_keyset_page() call until render_cached_rows() needs it."""
+    def load():
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            return fetch_keyset_page(cursor, select_sql, filters, params, sort_key)
+        finally:
+            cursor.close()
+            conn.close()
+    return load
+
+
+def render_cached_rows(rows_template, tables, load):
+    """Return (table body HTML, page) for a list route, querying only on a miss.
+
+    `load()` returns (rows, page) as fetch_keyset_page() does; `tables` lists
+    every table those rows read.
+    """
+    versions = get_table_versions(tables)
+    if len(versions) < len(tables):
+        # table_versions not migrated yet: nothing to validate entries against
+        rows, page = load()
+        return Markup(render_template(rows_template, rows=rows)), page
+
+    key = (
+        request.endpoint,
+        session.get("role"),
+        tuple(sorted(request.args.items(multi=True))),
+        tuple(versions[table][0] for table in tables),
+    )
+    cached = fragment_cache.get(key)
+    if cached is not None:
+        return cached
+    rows, page = load()
+    body = Markup(render_template(rows_template, rows=rows))
+    fragment_cache.set(key, (body, page), len(body))
+    return body, page
+
+
+# ---------------- Form pickers ----------------
+# Class <select>s are built from a per-process copy of the classes table that
+# is reloaded only once its table_versions entry moves. Students are too many
+# to ship as a <select>: forms use a typeahead on /lookup/students, a name
+# prefix scan on the students name index whose answers are cached in
+# fragment_cache under the students version.
+STUDENT_LOOKUP_LIMIT = 10
+STUDENT_LOOKUP_MAX_LIMIT = 50
+
+PICKER_QUERIES = {
+    "classes": "SELECT id, name FROM classes ORDER BY name",
+}
+_picker_cache = {}  # table -> (version, rows)
+
+
+def load_picker(table):
+    """[{id, name}] options for a form <select>; callers must not modify them."""
+    versions = get_table_versions((table,))
+    version = versions[table][0] if table in versions else None
+    cached = _picker_cache.get(table)
+    if cached is not None and version is not None and cached[0] == version:
+        return cached[1]
+
     conn = get_db_connection()
     cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM students ORDER BY id DESC")
-    students = cursor.fetchall()
+    cursor.execute(PICKER_QUERIES[table])
+    rows = cursor.fetchall()
     cursor.close()
     conn.close()
-    return render_template("students_list.html", students=students)
+    # The version was read first, so a write racing with the load can only
+    # leave newer rows under an older version, never the other way round
+    if version is not None:
+        _picker_cache[table] = (version, rows)
+    return rows
+
+
+def lookup_students(prefix, limit=STUDENT_LOOKUP_LIMIT):
+    """Up to `limit` students whose name starts with `prefix` (any case)."""
+    versions = get_table_versions(("students",))
+    key = ("lookup_students", prefix.casefold(), limit, versions.get("students", (None,))[0])
+    cached = fragment_cache.get(key) if "students" in versions else None
+    if cached is not None:
+        return cached
+
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(
+        "SELECT id, name, student_class FROM students WHERE name LIKE %s ESCAPE '!' ORDER BY name, id LIMIT %s",
+        (_like_prefix(prefix), limit),
+    )
+    rows = cursor.fetchall()
+    cursor.close()
+    conn.close()
+    if "students" in versions:
+        fragment_cache.set(key, rows, sum(len(r["name"]) + len(r["student_class"] or "") + 64 for r in rows))
+    return rows
+
+
+def load_student_choice(student_id):
+    """{id, name} of the student a picker should show as selected, or None."""
+    try:
+        student_id = int(student_id)
+    except (TypeError, ValueError):
+        return None
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("SELECT id, name FROM students WHERE id = %s", (student_id,))
+    student = cursor.fetchone()
+    cursor.close()
+    conn.close()
+    return student
+
+
+def resolve_student_choice(form):
+    """Student id picked in a form; without JS, an exact unique name also works."""
+    student = load_student_choice(form.get("student_id"))
+    if student:
+        return student["id"]
+    name = (form.get("student_name") or "").strip()
+    if not name:
+        return None
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT id FROM students WHERE name = %s LIMIT 2", (name,))
+    matches = cursor.fetchall()
+    cursor.close()
+    conn.close()
+    return matches[0][0] if len(matches) == 1 else None
+
+
+@app.route("/lookup/students")
+@reads_from_replica
+@requires_role('teacher', 'admin')
+def lookup_students_route():
+    """Typeahead for student pickers: ?q=<name prefix>&limit=N."""
+    q = request.args.get("q", "").strip()
+    limit = max(1, min(request.args.get("limit", STUDENT_LOOKUP_LIMIT, type=int), STUDENT_LOOKUP_MAX_LIMIT))
+    if not q:
+        return jsonify(results=[])
+    try:
+        rows = lookup_students(q, limit)
+    except mysql.connector.Error as e:
+        app.logger.error("Student lookup DB error", exc_info=e)
+        return jsonify(error="lookup failed"), 500
+    return jsonify(results=rows)
+
+
+# ---------------- Search ----------------
+# /search reads the search_terms table: one row per distinct word of each
+# searchable record, keyed (term, entity, entity_id). A query word matches
+# every term it is a prefix of through a range scan on that key. The write
+# routes keep the index current and `flask rebuild-search-index` repopulates it.
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE = 50
+SEARCH_MAX_TOKENS = 5
+SEARCH_SUGGEST_LIMIT = 8
+SEARCH_SUGGEST_SCAN = 2000  # index rows a typeahead query may walk
+SEARCH_TERM_MAX_LENGTH = 64
+SEARCH_REBUILD_CHUNK = 5000
+SEARCH_TERMS_MIGRATION = 8  # creates search_terms; upgrade_db indexes existing records after it
+
+# entity -> searchable columns with their rank weights, and how hits are shown
+SEARCH_SOURCES = {
+    "students": {"fields": {"name": 3, "student_class": 2}, "title": "name", "detail": "student_class",
+                 "label": "Student", "list_endpoint": "students_list"},
+    "teachers": {"fields": {"name": 3, "subject": 2}, "title": "name", "detail": "subject",
+                 "label": "Teacher", "list_endpoint": "teachers_list"},
+    "classes": {"fields": {"name": 3, "room": 2, "class_teacher": 1}, "title": "name", "detail": "room",
+                "label": "Class", "list_endpoint": "classes_list"},
+    "notices": {"fields": {"title": 3, "message": 1}, "title": "title", "detail": "message",
+                "label": "Notice", "list_endpoint": "notices_list"},
+}
+
+_SEARCH_WORD_RE = re.compile(r"\w+")
+
+
+def search_tokens(text):
+    """Lower-cased distinct words of `text`, in order of first appearance."""
+    words = (w[:SEARCH_TERM_MAX_LENGTH] for w in _SEARCH_WORD_RE.findall(str(text or "").lower()))
+    return list(dict.fromkeys(words))
+
+
+def _search_term_range(token):
+    """[low, high) bounds of every term starting with `token` (binary order)."""
+    return token, token[:-1] + chr(ord(token[-1]) + 1)
+
+
+def _search_rows(entity, row):
+    weights = {}
+    for column, weight in SEARCH_SOURCES[entity]["fields"].items():
+        for term in search_tokens(row.get(column)):
+            weights[term] = max(weight, weights.get(term, 0))
+    return [(term, entity, row["id"], weight) for term, weight in weights.items()]
+
+
+def _insert_search_rows(cursor, rows):
+    if rows:
+        cursor.executemany(
+            "INSERT INTO search_terms (term, entity, entity_id, weight) VALUES (%s, %s, %s, %s)",
+            rows,
+        )
+
+
+def index_search_document(cursor, entity, row):
+    """(Re)index one record; `row` holds its id and SEARCH_SOURCES fields."""
+    unindex_search_document(cursor, entity, row["id"])
+    _insert_search_rows(cursor, _search_rows(entity, row))
+
+
+def unindex_search_document(cursor, entity, entity_id):
+    cursor.execute("DELETE FROM search_terms WHERE entity = %s AND entity_id = %s", (entity, entity_id))
+
+
+def index_search_since(cursor, entity, after_id):
+    """Index every `entity` row with id > after_id (used after bulk inserts)."""
+    columns = ", ".join(SEARCH_SOURCES[entity]["fields"])
+    cursor.execute(f"SELECT id, {columns} FROM {entity} WHERE id > %s", (after_id,))
+    names = cursor.column_names
+    rows = [dict(zip(names, r)) for r in cursor.fetchall()]
+    cursor.execute("DELETE FROM search_terms WHERE entity = %s AND entity_id > %s", (entity, after_id))
+    _insert_search_rows(cursor, [t for row in rows for t in _search_rows(entity, row)])
+
+
+def rebuild_search_index():
+    """Repopulate search_terms from the source tables. Returns rows indexed per entity."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    counts = {}
+    try:
+        cursor.execute("DELETE FROM search_terms")
+        for entity, source in SEARCH_SOURCES.items():
+            columns = ", ".join(source["fields"])
+            counts[entity] = 0
+            last_id = 0
+            while True:
+                cursor.execute(
+                    f"SELECT id, {columns} FROM {entity} WHERE id > %s ORDER BY id LIMIT %s",
+                    (last_id, SEARCH_REBUILD_CHUNK),
+                )
+                names = cursor.column_names
+                rows = [dict(zip(names, r)) for r in cursor.fetchall()]
+                if not rows:
+                    break
+                _insert_search_rows(cursor, [t for row in rows for t in _search_rows(entity, row)])
+                counts[entity] += len(rows)
+                last_id = rows[-1]["id"]
+        conn.commit()
+    except mysql.connector.Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+    return counts
+
+
+def search_index_missing():
+    """True when search_terms exists but is empty while there are records to index."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        if SEARCH_TERMS_MIGRATION not in applied_migrations(cursor):
+            return False
+        cursor.execute("SELECT 1 FROM search_terms LIMIT 1")
+        if cursor.fetchone() is not None:
+            return False
+        for entity in SEARCH_SOURCES:
+            cursor.execute(f"SELECT 1 FROM {entity} LIMIT 1")
+            if cursor.fetchone() is not None:
+                return True
+        return False
+    finally:
+        cursor.close()
+        conn.close()
+
+
+@app.cli.command('rebuild-search-index')
+def rebuild_search_index_command():
+    """Rebuild the /search index from students, teachers, classes and notices."""
+    try:
+        counts = rebuild_search_index()
+    except mysql.connector.Error as e:
+        click.echo(f"DB error: {e}")
+        return
+    for entity, count in counts.items():
+        click.echo(f"{entity}: {count}")
+
+
+def run_search(cursor, q, entity=None, page=1, per_page=SEARCH_PAGE_SIZE):
+    """Ranked search; every query word must prefix-match a term of the record.
+
+    A record scores (2 * weight + 1 if the word matched exactly) for its best
+    term per query word. Returns ([(entity, id)], has_more).
+    """
+    tokens = search_tokens(q)[:SEARCH_MAX_TOKENS]
+    if not tokens:
+        return [], False
+    parts, params = [], []
+    for token in tokens:
+        part = (
+            "SELECT entity, entity_id, MAX(weight * 2 + (term = %s)) AS score"
+            " FROM search_terms WHERE term >= %s AND term < %s"
+        )
+        params += [token, *_search_term_range(token)]
+        if entity:
+            part += " AND entity = %s"
+            params.append(entity)
+        parts.append(part + " GROUP BY entity, entity_id")
+    cursor.execute(
+        f"SELECT entity, entity_id, SUM(score) AS score FROM ({' UNION ALL '.join(parts)}) matches"
+        " GROUP BY entity, entity_id HAVING COUNT(*) = %s"
+        " ORDER BY score DESC, entity, entity_id LIMIT %s OFFSET %s",
+        params + [len(tokens), per_page + 1, (page - 1) * per_page],
+    )
+    hits = [(row[0], row[1]) for row in cursor.fetchall()]
+    return hits[:per_page], len(hits) > per_page
+
+
+def suggest_search(cursor, q, limit=SEARCH_SUGGEST_LIMIT):
+    """Typeahead matches for `q`; every word is treated as a prefix.
+
+    The least common word drives the lookup: at most SEARCH_SUGGEST_SCAN of
+    its index entries are walked in term order and checked against the other
+    words, so the cost stays bounded however many records match.
+    """
+    tokens = search_tokens(q)[:SEARCH_MAX_TOKENS]
+    if not tokens:
+        return []
+    driver = tokens[-1]
+    if len(tokens) > 1:
+        counts = {}
+        for token in tokens:
+            cursor.execute(
+                "SELECT COUNT(*) FROM (SELECT 1 FROM search_terms WHERE term >= %s AND term < %s LIMIT %s) t",
+                (*_search_term_range(token), SEARCH_SUGGEST_SCAN),
+            )
+            counts[token] = cursor.fetchone()[0]
+        driver = min(tokens, key=lambda t: (counts[t], -len(t)))
+        if not counts[driver]:
+            return []
+
+    sql = (
+        "SELECT s.entity, s.entity_id, s.term, s.weight FROM ("
+        "SELECT entity, entity_id, term, weight FROM search_terms"
+        " WHERE term >= %s AND term < %s ORDER BY term LIMIT %s) s WHERE 1 = 1"
+    )
+    # With a single word the outer LIMIT is reached without any filtering
+    scan = SEARCH_SUGGEST_SCAN if len(tokens) > 1 else limit * 8
+    params = [*_search_term_range(driver), scan]
+    for token in tokens:
+        if token != driver:
+            sql += (
+                " AND EXISTS (SELECT 1 FROM search_terms o WHERE o.entity = s.entity"
+                " AND o.entity_id = s.entity_id AND o.term >= %s AND o.term < %s)"
+            )
+            params += _search_term_range(token)
+    cursor.execute(sql + " ORDER BY s.term LIMIT %s", params + [limit * 8])
+    candidates = sorted(cursor.fetchall(), key=lambda r: (r[2] != driver, -r[3], len(r[2])))
+    return list(dict.fromkeys((r[0], r[1]) for r in candidates))[:limit]
+
+
+def load_search_hits(cursor, hits):
+    """Turn [(entity, id)] into display dicts, keeping the order of `hits`."""
+    by_entity = {}
+    for entity, entity_id in hits:
+        by_entity.setdefault(entity, []).append(entity_id)
+    records = {}
+    for entity, ids in by_entity.items():
+        source = SEARCH_SOURCES[entity]
+        placeholders = ", ".join(["%s"] * len(ids))
+        cursor.execute(
+            f"SELECT id, {source['title']}, {source['detail']} FROM {entity} WHERE id IN ({placeholders})",
+            ids,
+        )
+        for entity_id, title, detail in cursor.fetchall():
+            records[(entity, entity_id)] = {
+                "entity": entity,
+                "id": entity_id,
+                "label": source["label"],
+                "title": title,
+                "detail": detail if detail is None or len(str(detail)) <= 120 else str(detail)[:117] + "...",
+                "url": url_for(source["list_endpoint"], name=title),
+            }
+    return [records[hit] for hit in hits if hit in records]
+
+
+@app.route("/search")
+@reads_from_replica
+def search():
+    q = request.args.get("q", "").strip()
+    entity = request.args.get("type")
+    if entity not in SEARCH_SOURCES:
+        entity = None
+    page = max(1, min(request.args.get("page", 1, type=int), SEARCH_MAX_PAGE))
+
+    results, has_more = [], False
+    if q:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            hits, has_more = run_search(cursor, q, entity=entity, page=page)
+            results = load_search_hits(cursor, hits)
+        finally:
+            cursor.close()
+            conn.close()
+    return render_template(
+        "search.html", q=q, entity=entity, results=results, page=page,
+        has_more=has_more and page < SEARCH_MAX_PAGE, sources=SEARCH_SOURCES,
+    )
+
+
+@app.route("/search/suggest")
+@reads_from_replica
+def search_suggest():
+    """JSON typeahead for the header search box."""
+    q = request.args.get("q", "").strip()
+    if not q:
+        return jsonify(results=[])
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        results = load_search_hits(cursor, suggest_search(cursor, q))
+    finally:
+        cursor.close()
+        conn.close()
+    return jsonify(results=results)
+
+
+# ---------------- Students CRUD ----------------
+@app.route("/students")
+@reads_from_replica
+def students_list():
+    filters, params = [], []
+    add_prefix_filter(filters, params, "name")
+    add_equals_filter(filters, params, "student_class", "student_class")
+
+    table_body, page = render_cached_rows(
+        "_students_rows.html", ("students",),
+        keyset_loader("SELECT * FROM students", filters, params, ID_SORT),
+    )
+    return render_template("students_list.html", table_body=table_body, page=page)
 
 
 @app.route("/students/add", methods=["GET", "POST"])
@@ -399,6 +2744,9 @@ def add_student():
                 "INSERT INTO students (name, student_class, age) VALUES (%s, %s, %s)",
                 (name, student_class, age),
             )
+            index_search_document(cursor, "students", {"id": cursor.lastrowid, "name": name, "student_class": student_class})
+            bump_counter(cursor, "students", 1)
+            bump_table_version(cursor, "students")
             conn.commit()
             flash("Student added successfully", "success")
             return redirect(url_for("students_list"))
@@ -444,6 +2792,8 @@ def edit_student(student_id):
                 "UPDATE students SET name=%s, student_class=%s, age=%s WHERE id=%s",
                 (name, student_class, age, student_id),
             )
+            index_search_document(cursor, "students", {"id": student_id, "name": name, "student_class": student_class})
+            bump_table_version(cursor, "students")
             conn.commit()
             flash("Student updated successfully", "success")
             return redirect(url_for("students_list"))
@@ -473,6 +2823,10 @@ def delete_student(student_id):
     cursor = conn.cursor()
     try:
         cursor.execute("DELETE FROM students WHERE id = %s", (student_id,))
+        if cursor.rowcount:
+            bump_counter(cursor, "students", -1)
+            unindex_search_document(cursor, "students", student_id)
+        bump_table_version(cursor, "students")
         conn.commit()
         flash("Student deleted", "info")
     except mysql.connector.Error as e:
@@ -490,14 +2844,17 @@ def delete_student(student_id):
 
 # ---------------- Teachers CRUD ----------------
 @app.route("/teachers")
+@reads_from_replica
 def teachers_list():
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM teachers ORDER BY id DESC")
-    teachers = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return render_template("teachers_list.html", teachers=teachers)
+    filters, params = [], []
+    add_prefix_filter(filters, params, "name")
+    add_equals_filter(filters, params, "subject", "subject")
+
+    table_body, page = render_cached_rows(
+        "_teachers_rows.html", ("teachers",),
+        keyset_loader("SELECT * FROM teachers", filters, params, ID_SORT),
+    )
+    return render_template("teachers_list.html", table_body=table_body, page=page)
 
 
 @app.route("/teachers/add", methods=["GET", "POST"])
@@ -515,6 +2872,9 @@ def add_teacher():
                 "INSERT INTO teachers (name, subject, phone) VALUES (%s, %s, %s)",
                 (name, subject, phone),
             )
+            index_search_document(cursor, "teachers", {"id": cursor.lastrowid, "name": name, "subject": subject})
+            bump_counter(cursor, "teachers", 1)
+            bump_table_version(cursor, "teachers")
             conn.commit()
             flash("Teacher added successfully", "success")
             return redirect(url_for("teachers_list"))
@@ -558,6 +2918,8 @@ def edit_teacher(teacher_id):
                 "UPDATE teachers SET name=%s, subject=%s, phone=%s WHERE id=%s",
                 (name, subject, phone, teacher_id),
             )
+            index_search_document(cursor, "teachers", {"id": teacher_id, "name": name, "subject": subject})
+            bump_table_version(cursor, "teachers")
             conn.commit()
             flash("Teacher updated successfully", "success")
             return redirect(url_for("teachers_list"))
@@ -586,6 +2948,10 @@ def delete_teacher(teacher_id):
     cursor = conn.cursor()
     try:
         cursor.execute("DELETE FROM teachers WHERE id = %s", (teacher_id,))
+        if cursor.rowcount:
+            bump_counter(cursor, "teachers", -1)
+            unindex_search_document(cursor, "teachers", teacher_id)
+        bump_table_version(cursor, "teachers")
         conn.commit()
         flash("Teacher deleted", "info")
     except mysql.connector.Error as e:
@@ -608,119 +2974,479 @@ def about():
 
 # ---------------- Attendance CRUD ----------------
 @app.route("/attendance")
+@reads_from_replica
 def attendance_list():
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
+    filters, params = [], []
+    add_equals_filter(filters, params, "a.class_id", "class_id", type=int)
+    add_equals_filter(filters, params, "a.status", "status")
+    add_date_range_filter(filters, params, "a.date")
+    add_prefix_filter(filters, params, "s.name")
+
+    classes = _load_classes()
+    table_body, page = render_cached_rows(
+        "_attendance_rows.html",
+        ("attendance", "students", "classes"),
+        keyset_loader(
+            """
+            SELECT a.id,
+                   a.date,
+                   a.status,
+                   s.name AS student_name,
+                   c.name AS class_name
+            FROM attendance a
+            JOIN students s ON a.student_id = s.id
+            JOIN classes c ON a.class_id = c.id
+            """,
+            filters,
+            params,
+            [("a.date", "date", _parse_date), ("a.id", "id", int)],
+        ),
+    )
+    return render_template("attendance_list.html", table_body=table_body, classes=classes, page=page)
+
+
+# ---------------- Attendance monthly rollup ----------------
+# attendance_monthly holds present/total counts per (YYYY-MM, class). The
+# attendance write paths adjust it in the same transaction, so the chart reads
+# a few dozen rows instead of grouping the whole attendance table.
+def _is_present(status):
+    return str(status).lower() == "present"
+
+
+def adjust_attendance_rollup(cursor, class_id, date, present_delta, total_delta):
+    """Add the given deltas to the rollup row for `date`'s month and `class_id`."""
+    if not present_delta and not total_delta:
+        return
     cursor.execute(
-        """
-        SELECT a.id,
-               a.date,
-               a.status,
-               s.name AS student_name,
-               c.name AS class_name
-        FROM attendance a
-        JOIN students s ON a.student_id = s.id
-        JOIN classes c ON a.class_id = c.id
-        ORDER BY a.date DESC, a.id DESC
-        """
+        "INSERT INTO attendance_monthly (period, class_id, present_count, total_count) "
+        "VALUES (%s, %s, %s, %s) "
+        + sql_upsert(("period", "class_id"), {
+            "present_count": "present_count + {new}",
+            "total_count": "total_count + {new}",
+        }),
+        (str(date)[:7], class_id, present_delta, total_delta),
     )
-    attendance_records = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return render_template("attendance_list.html", attendance_records=attendance_records)
 
 
-@app.route('/attendance/chart-data')
-def attendance_chart_data():
-    """Return monthly attendance percentages as JSON for charting."""
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT DATE_FORMAT(date, '%Y-%m') as period,
-                   SUM(LOWER(status)='present') as present_count,
-                   COUNT(*) as total_count
-            FROM attendance
-            GROUP BY period
-            ORDER BY period
-        """)
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
+def rebuild_attendance_rollup():
+    """Repopulate attendance_monthly from the attendance table. Returns row count."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM attendance_monthly")
+        cursor.execute(f"""
+            INSERT INTO attendance_monthly (period, class_id, present_count, total_count)
+            SELECT {sql_month("date")}, class_id, SUM(LOWER(status) = 'present'), COUNT(*)
+            FROM attendance
+            GROUP BY {sql_month("date")}, class_id
+        """)
+        rows = cursor.rowcount
+        conn.commit()
+    except mysql.connector.Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+    return rows
+
+
+@app.cli.command('rebuild-attendance-rollup')
+def rebuild_attendance_rollup_command():
+    """Recompute the monthly attendance rollup from scratch."""
+    try:
+        rows = rebuild_attendance_rollup()
+    except mysql.connector.Error as e:
+        click.echo(f"DB error: {e}")
+        return
+    click.echo(f"attendance_monthly rebuilt: {rows} rows")
+
+
+@app.route('/attendance/chart-data')
+@reads_from_replica
+@conditional_on_tables("attendance")
+def attendance_chart_data():
+    """Return monthly attendance percentages as JSON for charting.
+
+    Optional filters: class_id, and date_from/date_to (matched by month).
+    """
+    filters, params = [], []
+    add_equals_filter(filters, params, "class_id", "class_id", type=int)
+    for arg, op in (("date_from", ">="), ("date_to", "<=")):
+        try:
+            value = _parse_date(request.args.get(arg, ""))
+        except ValueError:
+            continue
+        filters.append(f"period {op} %s")
+        params.append(value.strftime("%Y-%m"))
+
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        sql = "SELECT period, SUM(present_count), SUM(total_count) FROM attendance_monthly"
+        if filters:
+            sql += " WHERE " + " AND ".join(filters)
+        # Months whose rows were all deleted linger as zero rows; skip them
+        sql += " GROUP BY period HAVING SUM(total_count) > 0 ORDER BY period"
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        cursor.close()
+        conn.close()
+
+        labels = [r[0] for r in rows]
+        percents = [round(float(r[1]) / float(r[2]) * 100, 2) if r[2] and r[2] > 0 else 0 for r in rows]
+        return jsonify({"labels": labels, "percent": percents}), 200
+    except Exception as e:
+        app.logger.error('Attendance chart data error', exc_info=e)
+        return jsonify({"error": str(e)}), 500
+
+
+# ---------------- Attendance writes & group commit ----------------
+# The attendance form and the class register both go through write_attendance().
+# By default it writes on the request's own connection and commits, as every
+# other route does. With SCHOOL_ERP_ATTENDANCE_GROUP_COMMIT=1 the rows instead
+# join a shared buffer. A single writer thread drains it, collecting requests
+# for up to ATTENDANCE_BATCH_WAIT_MS or ATTENDANCE_BATCH_MAX_ROWS rows, and
+# writes each batch with multi-row INSERTs and one commit. A request only
+# returns once the batch holding its rows has committed, so success is never
+# reported for rows that could still be lost. If a batch fails, its requests
+# are retried one by one, so a bad row fails only the request it came from.
+# When the queue is full, submitters wait up to ATTENDANCE_ENQUEUE_WAIT and
+# then get a "busy" reply.
+ATTENDANCE_GROUP_COMMIT = os.environ.get("SCHOOL_ERP_ATTENDANCE_GROUP_COMMIT", "0") == "1"
+ATTENDANCE_BATCH_MAX_ROWS = 1000
+ATTENDANCE_BATCH_WAIT_MS = 5
+ATTENDANCE_MAX_QUEUED = 256  # pending requests, not rows
+ATTENDANCE_ENQUEUE_WAIT = 2  # seconds
+ATTENDANCE_ACK_TIMEOUT = 30  # seconds to wait for a batch commit
+
+ATTENDANCE_INSERT_SQL = "INSERT INTO attendance (student_id, class_id, date, status) VALUES (%s, %s, %s, %s)"
+
+
+class AttendanceWriteBusy(Exception):
+    """Raised when attendance rows could not be queued or acknowledged in time."""
+
+
+def apply_attendance_writes(cursor, writes):
+    """Write [(rows, upsert)] in the caller's transaction; returns new rows per write.
+
+    The caller opens that transaction with begin_write() first.
+
+    Rows are (student_id, class_id, date, status). An upsert re-marks rows
+    that already exist instead of failing on them. The counter, monthly
+    rollup and table version are adjusted once for the whole lot.
+    """
+    # Lock every class/date an upsert touches so concurrent writers can't
+    # both count the same student as new
+    existing = {}
+    for rows, upsert in writes:
+        for _, class_id, date, _ in rows if upsert else ():
+            key = (str(class_id), str(date))
+            if key not in existing:
+                cursor.execute(
+                    "SELECT student_id, status FROM attendance WHERE class_id = %s AND date = %s" + sql_for_update(),
+                    (class_id, date),
+                )
+                existing[key] = dict(cursor.fetchall())
+
+    added = []
+    rollup = collections.defaultdict(lambda: [0, 0])  # (class_id, month) -> [present, total]
+    for rows, upsert in writes:
+        new = 0
+        for student_id, class_id, date, status in rows:
+            marked = existing.get((str(class_id), str(date)), {})
+            old = marked.get(student_id)
+            delta = rollup[(class_id, str(date)[:7])]
+            delta[0] += int(_is_present(status)) - int(old is not None and _is_present(old))
+            delta[1] += old is None
+            new += old is None
+            if (str(class_id), str(date)) in existing:
+                marked[student_id] = status
+        added.append(new)
+
+    # Consecutive writes of the same kind go out as one multi-row statement
+    for upsert, group in itertools.groupby(writes, key=lambda w: w[1]):
+        rows = [row for rows, _ in group for row in rows]
+        sql = ATTENDANCE_INSERT_SQL
+        if upsert:
+            sql += " " + sql_upsert(("student_id", "class_id", "date"), {"status": "{new}"})
+        cursor.executemany(sql, rows)
+
+    if sum(added):
+        bump_counter(cursor, "attendance", sum(added))
+    for (class_id, month), (present_delta, total_delta) in rollup.items():
+        adjust_attendance_rollup(cursor, class_id, month, present_delta, total_delta)
+    bump_table_version(cursor, "attendance")
+    return added
+
+
+class AttendanceWriteBuffer:
+    """Group commit for attendance writes: one transaction per batch of requests."""
+
+    def __init__(self, max_rows, max_wait, max_queued):
+        self.max_rows = max_rows
+        self.max_wait = max_wait
+        self._queue = queue.Queue(max_queued)
+        self._thread = None
+        self._lock = threading.Lock()
+        # The writer's own connection: submitters block on their Future while
+        # holding request connections, so it must not wait on the shared pool.
+        self._pool = ConnectionPool(
+            connect_raw, pool_size=1, max_overflow=0,
+            recycle=DB_POOL_CONFIG["recycle"], pre_ping=DB_POOL_CONFIG["pre_ping"],
+        )
+        self._stats = {"batches": 0, "requests": 0, "rows": 0, "retried_batches": 0, "rejected": 0}
+
+    def submit(self, rows, upsert=False, timeout=ATTENDANCE_ENQUEUE_WAIT):
+        """Queue rows for the next batch; returns a Future of the new-row count."""
+        future = Future()
+        try:
+            self._queue.put((rows, upsert, future), timeout=timeout)
+        except queue.Full:
+            with self._lock:
+                self._stats["rejected"] += 1
+            raise AttendanceWriteBusy("The server is busy. Please try again in a moment.")
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="attendance-writer", daemon=True)
+                    self._thread.start()
+        return future
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        rows = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while rows < self.max_rows:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            rows += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._flush(batch)
+            except Exception as e:
+                app.logger.error("Attendance batch failed", exc_info=e)
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _flush(self, batch):
+        conn = self._pool.connect()
+        cursor = conn.cursor()
+        try:
+            try:
+                begin_write(conn)
+                added = apply_attendance_writes(cursor, [(rows, upsert) for rows, upsert, _ in batch])
+                conn.commit()
+            except mysql.connector.Error:
+                conn.rollback()
+                if len(batch) == 1:
+                    raise
+                with self._lock:
+                    self._stats["retried_batches"] += 1
+                added = None
+            if added is not None:
+                for (_, _, future), new in zip(batch, added):
+                    future.set_result(new)
+            else:
+                for rows, upsert, future in batch:
+                    try:
+                        begin_write(conn)
+                        new = apply_attendance_writes(cursor, [(rows, upsert)])[0]
+                        conn.commit()
+                        future.set_result(new)
+                    except mysql.connector.Error as e:
+                        conn.rollback()
+                        future.set_exception(e)
+            with self._lock:
+                self._stats["batches"] += 1
+                self._stats["requests"] += len(batch)
+                self._stats["rows"] += sum(len(rows) for rows, _, _ in batch)
+        finally:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+            conn.close()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, queued=self._queue.qsize())
+
+
+attendance_write_buffer = AttendanceWriteBuffer(
+    ATTENDANCE_BATCH_MAX_ROWS, ATTENDANCE_BATCH_WAIT_MS / 1000, ATTENDANCE_MAX_QUEUED,
+)
 
-        labels = [r[0] for r in rows]
-        percents = [round((r[1] / r[2]) * 100, 2) if r[2] and r[2] > 0 else 0 for r in rows]
-        return jsonify({"labels": labels, "percent": percents}), 200
-    except Exception as e:
-        app.logger.error('Attendance chart data error', exc_info=e)
-        return jsonify({"error": str(e)}), 500
 
+def write_attendance(rows, upsert=False):
+    """Write one request's attendance rows and return how many were new.
+
+    Raises mysql.connector.Error if they were rejected, or AttendanceWriteBusy
+    if group commit couldn't queue or confirm them in time.
+    """
+    if ATTENDANCE_GROUP_COMMIT:
+        # The batch is written by another thread, outside this request
+        note_db_write()
+        future = attendance_write_buffer.submit(rows, upsert)
+        try:
+            return future.result(ATTENDANCE_ACK_TIMEOUT)
+        except FutureTimeoutError:
+            raise AttendanceWriteBusy(
+                "Saving is taking longer than usual. Check the attendance list before submitting again."
+            )
 
-def _load_students_and_classes():
     conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT id, name FROM students ORDER BY name")
-    students = cursor.fetchall()
-    cursor.execute("SELECT id, name FROM classes ORDER BY name")
-    classes = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return students, classes
+    cursor = conn.cursor()
+    try:
+        begin_write(conn)
+        added = apply_attendance_writes(cursor, [(rows, upsert)])[0]
+        conn.commit()
+        return added
+    except mysql.connector.Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
 
 
 @app.route("/attendance/add", methods=["GET", "POST"])
 @requires_role('teacher', 'admin')
 def add_attendance():
-    students, classes = _load_students_and_classes()
+    classes = _load_classes()
 
     if request.method == "POST":
-        student_id = request.form.get("student_id")
+        student_id = resolve_student_choice(request.form)
         class_id = request.form.get("class_id")
         date = request.form.get("date")
         status = request.form.get("status")
+        if student_id is None:
+            flash("Choose a student from the suggestions", "danger")
+            return render_template(
+                "attendance_form.html",
+                action="Add",
+                record={"student_id": None, "class_id": class_id, "date": date, "status": status},
+                student={"id": None, "name": request.form.get("student_name", "")},
+                classes=classes,
+            )
 
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        status_code = 200
         try:
-            cursor.execute(
-                "INSERT INTO attendance (student_id, class_id, date, status) VALUES (%s, %s, %s, %s)",
-                (student_id, class_id, date, status),
-            )
-            conn.commit()
+            write_attendance([(student_id, class_id, date, status)])
             flash("Attendance record added", "success")
             return redirect(url_for("attendance_list"))
+        except AttendanceWriteBusy as e:
+            flash(str(e), "danger")
+            status_code = 503
         except mysql.connector.Error as e:
-            conn.rollback()
             app.logger.error("Add attendance DB error", exc_info=e)
             flash("Failed to add attendance record. See server logs.", "danger")
-        finally:
-            try:
-                cursor.close()
-                conn.close()
-            except Exception:
-                pass
 
         return render_template(
             "attendance_form.html",
             action="Add",
-            record=None,
-            students=students,
+            record={"student_id": student_id, "class_id": class_id, "date": date, "status": status},
+            student=load_student_choice(student_id),
             classes=classes,
-        )
+        ), status_code
 
     return render_template(
         "attendance_form.html",
         action="Add",
         record=None,
-        students=students,
+        student=None,
         classes=classes,
     )
 
 
+ATTENDANCE_STATUSES = ("Present", "Absent")
+
+
+def _load_register_roster(class_row, date):
+    """Students enrolled in `class_row` with their status for `date`, if marked."""
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute(
+        """
+        SELECT s.id, s.name, a.status
+        FROM students s
+        LEFT JOIN attendance a
+               ON a.student_id = s.id AND a.class_id = %s AND a.date = %s
+        WHERE s.student_class = %s
+        ORDER BY s.name
+        """,
+        (class_row["id"], date, class_row["name"]),
+    )
+    roster = cursor.fetchall()
+    cursor.close()
+    conn.close()
+    return roster
+
+
+@app.route("/attendance/register", methods=["GET", "POST"])
+@requires_role('teacher', 'admin')
+def attendance_register():
+    """Mark a whole class for one date in a single submission."""
+    classes = _load_classes()
+    class_id = request.values.get("class_id", type=int)
+    date = request.values.get("date") or datetime.date.today().isoformat()
+    try:
+        _parse_date(date)
+    except ValueError:
+        flash("Invalid date", "danger")
+        date = datetime.date.today().isoformat()
+
+    selected = next((c for c in classes if c["id"] == class_id), None)
+    roster = _load_register_roster(selected, date) if selected else []
+    status_code = 200
+
+    if request.method == "POST" and selected:
+        entries = []
+        for s in roster:
+            status = request.form.get(f"status_{s['id']}")
+            if status in ATTENDANCE_STATUSES:
+                entries.append((s["id"], selected["id"], date, status))
+
+        if not entries:
+            flash("Nothing to save: mark at least one student.", "danger")
+        else:
+            try:
+                # Sent as one multi-row INSERT; re-submitting only updates statuses
+                added = write_attendance(entries, upsert=True)
+                flash(f"Register saved for {len(entries)} students ({added} new)", "success")
+                return redirect(url_for("attendance_list", class_id=selected["id"], date_from=date, date_to=date))
+            except AttendanceWriteBusy as e:
+                flash(str(e), "danger")
+                status_code = 503
+            except mysql.connector.Error as e:
+                app.logger.error("Save attendance register DB error", exc_info=e)
+                flash("Failed to save attendance register. See server logs.", "danger")
+
+    return render_template(
+        "attendance_register.html",
+        classes=classes,
+        selected=selected,
+        date=date,
+        roster=roster,
+        statuses=ATTENDANCE_STATUSES,
+    ), status_code
+
+
 @app.route("/attendance/edit/<int:attendance_id>", methods=["GET", "POST"])
 @requires_role('teacher', 'admin')
 def edit_attendance(attendance_id):
-    students, classes = _load_students_and_classes()
+    classes = _load_classes()
 
     conn = get_db_connection()
     cursor = conn.cursor(dictionary=True)
@@ -734,19 +3460,41 @@ def edit_attendance(attendance_id):
         return redirect(url_for("attendance_list"))
 
     if request.method == "POST":
-        student_id = request.form.get("student_id")
+        student_id = resolve_student_choice(request.form)
         class_id = request.form.get("class_id")
         date = request.form.get("date")
         status = request.form.get("status")
 
         try:
+            if student_id is None:
+                raise ValueError("no student chosen")
+            # Re-read the row under a lock: a concurrent edit or delete may
+            # have changed it since the form was loaded
+            begin_write(conn)
+            cursor.execute(
+                "SELECT class_id, date, status FROM attendance WHERE id = %s" + sql_for_update(),
+                (attendance_id,),
+            )
+            current = cursor.fetchone()
+            if current is None:
+                conn.rollback()
+                flash("Attendance record not found", "danger")
+                return redirect(url_for("attendance_list"))
             cursor.execute(
                 "UPDATE attendance SET student_id=%s, class_id=%s, date=%s, status=%s WHERE id=%s",
                 (student_id, class_id, date, status, attendance_id),
             )
+            # MySQL reports 0 for an update that changed nothing, which
+            # leaves the rollup as it was too
+            if cursor.rowcount:
+                adjust_attendance_rollup(cursor, current["class_id"], current["date"], -int(_is_present(current["status"])), -1)
+                adjust_attendance_rollup(cursor, class_id, date, int(_is_present(status)), 1)
+            bump_table_version(cursor, "attendance")
             conn.commit()
             flash("Attendance record updated", "success")
             return redirect(url_for("attendance_list"))
+        except ValueError:
+            flash("Choose a student from the suggestions", "danger")
         except mysql.connector.Error as e:
             conn.rollback()
             app.logger.error("Update attendance DB error", exc_info=e)
@@ -762,7 +3510,7 @@ def edit_attendance(attendance_id):
             "attendance_form.html",
             action="Edit",
             record={"id": attendance_id, "student_id": student_id, "class_id": class_id, "date": date, "status": status},
-            students=students,
+            student=load_student_choice(student_id) or {"id": None, "name": request.form.get("student_name", "")},
             classes=classes,
         )
 
@@ -772,7 +3520,7 @@ def edit_attendance(attendance_id):
         "attendance_form.html",
         action="Edit",
         record=record,
-        students=students,
+        student=load_student_choice(record["student_id"]),
         classes=classes,
     )
 
@@ -783,7 +3531,18 @@ def delete_attendance(attendance_id):
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
+        begin_write(conn)
+        cursor.execute(
+            "SELECT class_id, date, status FROM attendance WHERE id = %s" + sql_for_update(),
+            (attendance_id,),
+        )
+        old = cursor.fetchone()
         cursor.execute("DELETE FROM attendance WHERE id = %s", (attendance_id,))
+        if cursor.rowcount:
+            bump_counter(cursor, "attendance", -1)
+            old_class_id, old_date, old_status = old
+            adjust_attendance_rollup(cursor, old_class_id, old_date, -int(_is_present(old_status)), -1)
+        bump_table_version(cursor, "attendance")
         conn.commit()
         flash("Attendance record deleted", "info")
     except mysql.connector.Error as e:
@@ -801,35 +3560,37 @@ def delete_attendance(attendance_id):
 
 # ---------------- Notices CRUD ----------------
 @app.route("/notices")
+@reads_from_replica
 def notices_list():
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute(
-        """
-        SELECT n.id,
-               n.title,
-               n.message,
-               n.created_at,
-               c.name AS class_name
-        FROM notices n
-        LEFT JOIN classes c ON n.class_id = c.id
-        ORDER BY n.created_at DESC, n.id DESC
-        """
+    filters, params = [], []
+    add_equals_filter(filters, params, "n.class_id", "class_id", type=int)
+    add_date_range_filter(filters, params, "n.created_at")
+    add_prefix_filter(filters, params, "n.title")
+
+    classes = _load_classes()
+    table_body, page = render_cached_rows(
+        "_notices_rows.html",
+        ("notices", "classes"),
+        keyset_loader(
+            """
+            SELECT n.id,
+                   n.title,
+                   n.message,
+                   n.created_at,
+                   c.name AS class_name
+            FROM notices n
+            LEFT JOIN classes c ON n.class_id = c.id
+            """,
+            filters,
+            params,
+            [("n.created_at", "created_at", _parse_date), ("n.id", "id", int)],
+        ),
     )
-    notices = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return render_template("notices_list.html", notices=notices)
+    return render_template("notices_list.html", table_body=table_body, classes=classes, page=page)
 
 
 def _load_classes():
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT id, name FROM classes ORDER BY name")
-    classes = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return classes
+    return load_picker("classes")
 
 
 @app.route("/notices/add", methods=["GET", "POST"])
@@ -850,7 +3611,11 @@ def add_notice():
                 "INSERT INTO notices (class_id, title, message, created_at) VALUES (%s, %s, %s, %s)",
                 (class_id, title, message, created_at),
             )
+            index_search_document(cursor, "notices", {"id": cursor.lastrowid, "title": title, "message": message})
+            bump_counter(cursor, "notices", 1)
+            bump_table_version(cursor, "notices")
             conn.commit()
+            invalidate_recent_notices()
             flash("Notice added", "success")
             return redirect(url_for("notices_list"))
         except mysql.connector.Error as e:
@@ -896,7 +3661,10 @@ def edit_notice(notice_id):
                 "UPDATE notices SET class_id=%s, title=%s, message=%s, created_at=%s WHERE id=%s",
                 (class_id, title, message, created_at, notice_id),
             )
+            index_search_document(cursor, "notices", {"id": notice_id, "title": title, "message": message})
+            bump_table_version(cursor, "notices")
             conn.commit()
+            invalidate_recent_notices()
             flash("Notice updated", "success")
             return redirect(url_for("notices_list"))
         except mysql.connector.Error as e:
@@ -924,7 +3692,12 @@ def delete_notice(notice_id):
     cursor = conn.cursor()
     try:
         cursor.execute("DELETE FROM notices WHERE id = %s", (notice_id,))
+        if cursor.rowcount:
+            bump_counter(cursor, "notices", -1)
+            unindex_search_document(cursor, "notices", notice_id)
+        bump_table_version(cursor, "notices")
         conn.commit()
+        invalidate_recent_notices()
         flash("Notice deleted", "info")
     except mysql.connector.Error as e:
         conn.rollback()
@@ -941,14 +3714,16 @@ def delete_notice(notice_id):
 
 # ---------------- Classes CRUD ----------------
 @app.route("/classes")
+@reads_from_replica
 def classes_list():
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM classes ORDER BY id DESC")
-    classes = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return render_template("classes_list.html", classes=classes)
+    filters, params = [], []
+    add_prefix_filter(filters, params, "name")
+
+    table_body, page = render_cached_rows(
+        "_classes_rows.html", ("classes",),
+        keyset_loader("SELECT * FROM classes", filters, params, ID_SORT),
+    )
+    return render_template("classes_list.html", table_body=table_body, page=page)
 
 
 @app.route("/classes/add", methods=["GET", "POST"])
@@ -966,6 +3741,9 @@ def add_class():
                 "INSERT INTO classes (name, room, class_teacher) VALUES (%s, %s, %s)",
                 (name, room, class_teacher),
             )
+            index_search_document(cursor, "classes", {"id": cursor.lastrowid, "name": name, "room": room, "class_teacher": class_teacher})
+            bump_counter(cursor, "classes", 1)
+            bump_table_version(cursor, "classes")
             conn.commit()
             flash("Class added successfully", "success")
             return redirect(url_for("classes_list"))
@@ -1009,6 +3787,8 @@ def edit_class(class_id):
                 "UPDATE classes SET name=%s, room=%s, class_teacher=%s WHERE id=%s",
                 (name, room, class_teacher, class_id),
             )
+            index_search_document(cursor, "classes", {"id": class_id, "name": name, "room": room, "class_teacher": class_teacher})
+            bump_table_version(cursor, "classes")
             conn.commit()
             flash("Class updated successfully", "success")
             return redirect(url_for("classes_list"))
@@ -1037,6 +3817,10 @@ def delete_class(class_id):
     cursor = conn.cursor()
     try:
         cursor.execute("DELETE FROM classes WHERE id = %s", (class_id,))
+        if cursor.rowcount:
+            bump_counter(cursor, "classes", -1)
+            unindex_search_document(cursor, "classes", class_id)
+        bump_table_version(cursor, "classes")
         conn.commit()
         flash("Class deleted", "info")
     except mysql.connector.Error as e:
@@ -1054,24 +3838,30 @@ def delete_class(class_id):
 
 # ---------------- Fees CRUD ----------------
 @app.route("/fees")
+@reads_from_replica
 def fees_list():
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM fees ORDER BY id DESC")
-    fees = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return render_template("fees_list.html", fees=fees)
+    filters, params = [], []
+    add_prefix_filter(filters, params, "student_name")
+    add_equals_filter(filters, params, "status", "status")
+    add_date_range_filter(filters, params, "paid_date")
+
+    table_body, page = render_cached_rows(
+        "_fees_rows.html", ("fees",),
+        keyset_loader("SELECT * FROM fees", filters, params, ID_SORT),
+    )
+    return render_template("fees_list.html", table_body=table_body, page=page)
 
 
 @app.route('/fees/chart-data')
+@reads_from_replica
+@conditional_on_tables("fees")
 def fees_chart_data():
     """Return monthly fees totals as JSON for charting."""
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
-        cursor.execute("""
-            SELECT DATE_FORMAT(paid_date, '%Y-%m') as period,
+        cursor.execute(f"""
+            SELECT {sql_month("paid_date")} as period,
                    SUM(amount) as total_amount
             FROM fees
             WHERE paid_date IS NOT NULL
@@ -1107,6 +3897,7 @@ def add_fee():
                 "INSERT INTO fees (student_name, amount, paid_date, status) VALUES (%s, %s, %s, %s)",
                 (student_name, amount, paid_date, status),
             )
+            bump_table_version(cursor, "fees")
             conn.commit()
             flash("Fee record added", "success")
             return redirect(url_for("fees_list"))
@@ -1151,6 +3942,7 @@ def edit_fee(fee_id):
                 "UPDATE fees SET student_name=%s, amount=%s, paid_date=%s, status=%s WHERE id=%s",
                 (student_name, amount, paid_date, status, fee_id),
             )
+            bump_table_version(cursor, "fees")
             conn.commit()
             flash("Fee record updated", "success")
             return redirect(url_for("fees_list"))
@@ -1179,6 +3971,7 @@ def delete_fee(fee_id):
     cursor = conn.cursor()
     try:
         cursor.execute("DELETE FROM fees WHERE id = %s", (fee_id,))
+        bump_table_version(cursor, "fees")
         conn.commit()
         flash("Fee record deleted", "info")
     except mysql.connector.Error as e:
@@ -1196,14 +3989,22 @@ def delete_fee(fee_id):
 
 # ---------------- Exams CRUD ----------------
 @app.route("/exams")
+@reads_from_replica
 def exams_list():
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM exams ORDER BY exam_date DESC, id DESC")
-    exams = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return render_template("exams_list.html", exams=exams)
+    filters, params = [], []
+    add_prefix_filter(filters, params, "name")
+    add_date_range_filter(filters, params, "exam_date")
+
+    table_body, page = render_cached_rows(
+        "_exams_rows.html", ("exams",),
+        keyset_loader(
+            "SELECT * FROM exams",
+            filters,
+            params,
+            [("exam_date", "exam_date", _parse_date), ("id", "id", int)],
+        ),
+    )
+    return render_template("exams_list.html", table_body=table_body, page=page)
 
 
 @app.route("/exams/add", methods=["GET", "POST"])
@@ -1221,6 +4022,7 @@ def add_exam():
                 "INSERT INTO exams (name, exam_date, remarks) VALUES (%s, %s, %s)",
                 (name, exam_date, remarks),
             )
+            bump_table_version(cursor, "exams")
             conn.commit()
             flash("Exam added", "success")
             return redirect(url_for("exams_list"))
@@ -1264,6 +4066,7 @@ def edit_exam(exam_id):
                 "UPDATE exams SET name=%s, exam_date=%s, remarks=%s WHERE id=%s",
                 (name, exam_date, remarks, exam_id),
             )
+            bump_table_version(cursor, "exams")
             conn.commit()
             flash("Exam updated", "success")
             return redirect(url_for("exams_list"))
@@ -1292,6 +4095,7 @@ def delete_exam(exam_id):
     cursor = conn.cursor()
     try:
         cursor.execute("DELETE FROM exams WHERE id = %s", (exam_id,))
+        bump_table_version(cursor, "exams")
         conn.commit()
         flash("Exam deleted", "info")
     except mysql.connector.Error as e:
@@ -1307,6 +4111,777 @@ def delete_exam(exam_id):
     return redirect(url_for("exams_list"))
 
 
+# ---------------- Export ----------------
+# Exports stream straight from an unbuffered (server-side) cursor in fixed-size
+# chunks, so memory use stays flat no matter how large the table is.
+EXPORT_CHUNK_ROWS = 1000
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+# entity -> (SELECT ... FROM ..., column used by date_from/date_to or None)
+EXPORT_QUERIES = {
+    "students": ("SELECT id, name, student_class, age FROM students", None),
+    "teachers": ("SELECT id, name, subject, phone FROM teachers", None),
+    "classes": ("SELECT id, name, room, class_teacher FROM classes", None),
+    "attendance": ("SELECT id, student_id, class_id, date, status FROM attendance", "date"),
+    "notices": ("SELECT id, class_id, title, message, created_at FROM notices", "created_at"),
+    "fees": ("SELECT id, student_name, amount, paid_date, status FROM fees", "paid_date"),
+    "exams": ("SELECT id, name, exam_date, remarks FROM exams", "exam_date"),
+}
+
+
+def _format_export_chunk(fmt, columns, rows):
+    buf = io.StringIO()
+    if fmt == "csv":
+        csv.writer(buf).writerows(rows)
+    else:
+        for row in rows:
+            buf.write(json.dumps(dict(zip(columns, row)), default=str))
+            buf.write("\n")
+    return buf.getvalue()
+
+
+def iter_export(entity, fmt, date_from=None, date_to=None, chunk_rows=EXPORT_CHUNK_ROWS, pool=None):
+    """Yield an entity's rows as CSV or NDJSON text, one chunk at a time.
+
+    Uses its own connection from `pool` (default: the primary's), not the
+    request one, because the generator outlives the view function when streamed.
+    """
+    select_sql, date_column = EXPORT_QUERIES[entity]
+    filters, params = [], []
+    if date_column:
+        if date_from:
+            filters.append(f"{date_column} >= %s")
+            params.append(date_from)
+        if date_to:
+            filters.append(f"{date_column} <= %s")
+            params.append(date_to)
+    sql = select_sql
+    if filters:
+        sql += " WHERE " + " AND ".join(filters)
+    sql += " ORDER BY id"
+
+    conn = (pool or get_db_pool()).connect()
+    cursor = conn.cursor(buffered=False)
+    try:
+        cursor.execute(sql, params)
+        columns = list(cursor.column_names)
+        if fmt == "csv":
+            yield _format_export_chunk(fmt, None, [columns])
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                break
+            yield _format_export_chunk(fmt, columns, rows)
+    finally:
+        # An abandoned download leaves unread rows behind; the pool discards
+        # such connections instead of reusing them
+        try:
+            cursor.close()
+        except Exception:
+            pass
+        conn.close()
+
+
+def _export_date_args(date_from, date_to):
+    try:
+        return (
+            _parse_date(date_from) if date_from else None,
+            _parse_date(date_to) if date_to else None,
+        )
+    except ValueError:
+        return None
+
+
+@app.route("/export/<entity>.<fmt>")
+@reads_from_replica
+@requires_role('teacher', 'admin')
+def export_entity(entity, fmt):
+    """Stream a full table as CSV or NDJSON (optional date_from/date_to)."""
+    if entity not in EXPORT_QUERIES or fmt not in EXPORT_FORMATS:
+        abort(404)
+    dates = _export_date_args(request.args.get("date_from"), request.args.get("date_to"))
+    if dates is None:
+        abort(400, "date_from/date_to must be YYYY-MM-DD")
+
+    response = Response(iter_export(entity, fmt, *dates, pool=read_pool()), mimetype=EXPORT_FORMATS[fmt])
+    response.headers["Content-Disposition"] = f'attachment; filename="{entity}.{fmt}"'
+    return response
+
+
+@app.cli.command('export')
+@click.argument('entity', type=click.Choice(sorted(EXPORT_QUERIES)))
+@click.option('--format', 'fmt', type=click.Choice(sorted(EXPORT_FORMATS)), default='csv', show_default=True)
+@click.option('--output', '-o', type=click.File('w', encoding='utf-8'), default='-', help='Output file (default: stdout).')
+@click.option('--date-from', default=None, help='Only rows on/after this date (YYYY-MM-DD).')
+@click.option('--date-to', default=None, help='Only rows on/before this date (YYYY-MM-DD).')
+def export_command(entity, fmt, output, date_from, date_to):
+    """Stream an entity's rows to a CSV or NDJSON file."""
+    dates = _export_date_args(date_from, date_to)
+    if dates is None:
+        raise click.BadParameter('dates must be YYYY-MM-DD')
+    try:
+        for chunk in iter_export(entity, fmt, *dates):
+            output.write(chunk)
+    except mysql.connector.Error as e:
+        click.echo(f"DB error: {e}", err=True)
+
+
+# ---------------- Bulk import ----------------
+# CSV rows are validated one by one and inserted in chunks with executemany
+# and one commit per chunk. A chunk that hits a lock wait timeout or deadlock
+# is retried whole, up to IMPORT_LOCK_RETRIES times; if it is rejected for
+# any other reason it is retried row by row so only the offending rows are
+# reported.
+IMPORT_BATCH_SIZE = 1000
+IMPORT_MAX_REPORTED_ERRORS = 100
+IMPORT_LOCK_RETRIES = 3
+IMPORT_RETRY_BACKOFF = 0.1  # seconds, times the attempt number
+_LOCK_ERRNOS = (1205, 1213)  # lock wait timeout, deadlock
+
+
+def _required_text(value):
+    value = (value or "").strip()
+    if not value:
+        raise ValueError("is required")
+    return value
+
+
+def _optional_text(value):
+    return (value or "").strip() or None
+
+
+def _optional_int(value):
+    value = (value or "").strip()
+    try:
+        return int(value) if value else None
+    except ValueError:
+        raise ValueError("must be an integer")
+
+
+def _required_amount(value):
+    try:
+        return decimal.Decimal(_required_text(value))
+    except decimal.InvalidOperation:
+        raise ValueError("must be a number")
+
+
+def _optional_date(value):
+    value = (value or "").strip()
+    return _parse_date(value) if value else None
+
+
+# entity -> (INSERT statement, [(csv column, parser)] in statement order)
+IMPORT_SPECS = {
+    "students": (
+        "INSERT INTO students (name, student_class, age) VALUES (%s, %s, %s)",
+        [("name", _required_text), ("student_class", _required_text), ("age", _optional_int)],
+    ),
+    "teachers": (
+        "INSERT INTO teachers (name, subject, phone) VALUES (%s, %s, %s)",
+        [("name", _required_text), ("subject", _required_text), ("phone", _optional_text)],
+    ),
+    "fees": (
+        "INSERT INTO fees (student_name, amount, paid_date, status) VALUES (%s, %s, %s, %s)",
+        [("student_name", _required_text), ("amount", _required_amount), ("paid_date", _optional_date), ("status", _required_text)],
+    ),
+}
+
+
+def _record_import_error(result, line, message):
+    result["error_count"] += 1
+    if len(result["errors"]) < IMPORT_MAX_REPORTED_ERRORS:
+        result["errors"].append((line, message))
+
+
+def _after_import_insert(cursor, entity, count, after_id=None):
+    if entity in COUNTED_TABLES:
+        bump_counter(cursor, entity, count)
+    if entity in SEARCH_SOURCES:
+        index_search_since(cursor, entity, after_id)
+    bump_table_version(cursor, entity)
+
+
+def _max_id(cursor, table):
+    cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}")
+    return cursor.fetchone()[0]
+
+
+def _flush_import_batch(conn, cursor, entity, batch, result):
+    sql = IMPORT_SPECS[entity][0]
+    for attempt in range(IMPORT_LOCK_RETRIES + 1):
+        try:
+            # The search index picks up rows after this id, so no other
+            # insert may land between reading it and the executemany
+            begin_write(conn)
+            after_id = _max_id(cursor, entity) if entity in SEARCH_SOURCES else None
+            cursor.executemany(sql, [values for _, values in batch])
+            _after_import_insert(cursor, entity, len(batch), after_id)
+            conn.commit()
+            result["inserted"] += len(batch)
+            return
+        except mysql.connector.Error as e:
+            conn.rollback()
+            if e.errno not in _LOCK_ERRNOS or attempt == IMPORT_LOCK_RETRIES:
+                break
+            app.logger.info("Import batch hit a lock (%s), retrying", e)
+            time.sleep(IMPORT_RETRY_BACKOFF * (attempt + 1))
+
+    for line, values in batch:
+        try:
+            cursor.execute(sql, values)
+            _after_import_insert(cursor, entity, 1, cursor.lastrowid - 1)
+            conn.commit()
+            result["inserted"] += 1
+        except mysql.connector.Error as e:
+            conn.rollback()
+            _record_import_error(result, line, getattr(e, "msg", None) or str(e))
+
+
+def import_csv(entity, lines, batch_size=IMPORT_BATCH_SIZE):
+    """Import CSV text (any iterable of lines) into `entity`.
+
+    The header row must name the columns in IMPORT_SPECS (any order, extra
+    columns ignored). Returns a dict with inserted/error counts, the first
+    IMPORT_MAX_REPORTED_ERRORS (line, message) pairs and the throughput.
+    Raises ValueError if required columns are missing.
+    """
+    fields = IMPORT_SPECS[entity][1]
+    reader = csv.DictReader(lines)
+    header = [(name or "").strip().lower() for name in (reader.fieldnames or [])]
+    missing = [name for name, parse in fields
+               if parse in (_required_text, _required_amount) and name not in header]
+    if missing:
+        raise ValueError(f"CSV is missing required column(s): {', '.join(missing)}")
+    reader.fieldnames = header
+
+    result = {"inserted": 0, "error_count": 0, "errors": [], "seconds": 0.0, "rows_per_second": 0}
+    started = time.monotonic()
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        batch = []
+        for row in reader:
+            try:
+                values = []
+                for name, parse in fields:
+                    try:
+                        values.append(parse(row.get(name)))
+                    except ValueError as e:
+                        raise ValueError(f"{name} {e}")
+            except ValueError as e:
+                _record_import_error(result, reader.line_num, str(e))
+                continue
+            batch.append((reader.line_num, tuple(values)))
+            if len(batch) >= batch_size:
+                _flush_import_batch(conn, cursor, entity, batch, result)
+                batch = []
+        if batch:
+            _flush_import_batch(conn, cursor, entity, batch, result)
+    finally:
+        cursor.close()
+        conn.close()
+
+    result["seconds"] = round(time.monotonic() - started, 3)
+    if result["seconds"]:
+        result["rows_per_second"] = int(result["inserted"] / result["seconds"])
+    return result
+
+
+@app.route("/import/<entity>", methods=["GET", "POST"])
+@requires_role('teacher', 'admin')
+def import_entity(entity):
+    """Upload a CSV of students, teachers or fees."""
+    if entity not in IMPORT_SPECS:
+        abort(404)
+    columns = [name for name, _ in IMPORT_SPECS[entity][1]]
+    result = None
+
+    if request.method == "POST":
+        upload = request.files.get("file")
+        if not upload or not upload.filename:
+            flash("Choose a CSV file to import.", "danger")
+        else:
+            lines = io.TextIOWrapper(upload.stream, encoding="utf-8-sig", newline="")
+            try:
+                result = import_csv(entity, lines)
+            except ValueError as e:
+                flash(str(e), "danger")
+            except mysql.connector.Error as e:
+                app.logger.error("Import DB error", exc_info=e)
+                flash("Import failed. See server logs.", "danger")
+            else:
+                category = "success" if not result["error_count"] else "info"
+                flash(f"Imported {result['inserted']} rows ({result['error_count']} rejected)", category)
+
+    return render_template("import_form.html", entity=entity, columns=columns, result=result)
+
+
+@app.cli.command('import')
+@click.argument('entity', type=click.Choice(sorted(IMPORT_SPECS)))
+@click.argument('csv_file', type=click.File('r', encoding='utf-8-sig'))
+@click.option('--batch-size', default=IMPORT_BATCH_SIZE, show_default=True, help='Rows per INSERT/commit.')
+def import_command(entity, csv_file, batch_size):
+    """Bulk-import a CSV file of students, teachers or fees."""
+    try:
+        result = import_csv(entity, csv_file, batch_size=batch_size)
+    except (ValueError, mysql.connector.Error) as e:
+        click.echo(f"Import failed: {e}")
+        return
+    for line, message in result["errors"]:
+        click.echo(f"line {line}: {message}")
+    if result["error_count"] > len(result["errors"]):
+        click.echo(f"... and {result['error_count'] - len(result['errors'])} more errors")
+    click.echo(
+        f"Imported {result['inserted']} rows, rejected {result['error_count']} "
+        f"in {result['seconds']}s ({result['rows_per_second']} rows/s)"
+    )
+
+
+# ---------------- JSON API (v1) ----------------
+# Read and write access for integrations, one resource per entity:
+#   GET   /api/v1/<resource>?fields=id,name&after=<id>&limit=100   keyset page, ascending id
+#   GET   /api/v1/<resource>?ids=3,9,27                            batch lookup, one query
+#   GET   /api/v1/<resource>/<id>
+#   POST  /api/v1/<resource>        an object, or a list of them: bulk create
+#   PATCH /api/v1/<resource>        a list of objects with "id": bulk update
+#   PATCH /api/v1/<resource>/<id>
+# `fields` becomes the SELECT column list; "id" is always included. A bulk
+# write is one transaction: if any item fails, nothing is written.
+API_PAGE_SIZE = 100
+API_MAX_PAGE_SIZE = 1000
+API_MAX_IDS = 500
+API_MAX_BATCH = 1000
+
+
+def _required_int(value):
+    value = _required_text(value)
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError("must be an integer")
+
+
+def _required_date(value):
+    value = _required_text(value)
+    try:
+        return _parse_date(value)
+    except ValueError:
+        raise ValueError("must be a YYYY-MM-DD date")
+
+
+def _attendance_status(value):
+    value = _required_text(value).capitalize()
+    if value not in ATTENDANCE_STATUSES:
+        raise ValueError(f"must be one of {', '.join(ATTENDANCE_STATUSES)}")
+    return value
+
+
+# resource -> {writable column: parser}, in table order
+API_RESOURCES = {
+    "students": {"name": _required_text, "student_class": _required_text, "age": _optional_int},
+    "teachers": {"name": _required_text, "subject": _required_text, "phone": _optional_text},
+    "classes": {"name": _required_text, "room": _optional_text, "class_teacher": _optional_text},
+    "attendance": {"student_id": _required_int, "class_id": _required_int, "date": _required_date,
+                   "status": _attendance_status},
+    "notices": {"class_id": _optional_int, "title": _required_text, "message": _required_text,
+                "created_at": _required_date},
+    "fees": {"student_name": _required_text, "amount": _required_amount, "paid_date": _optional_date,
+             "status": _required_text},
+    "exams": {"name": _required_text, "exam_date": _required_date, "remarks": _optional_text},
+}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message, details=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.details = details
+
+
+@app.errorhandler(ApiError)
+def handle_api_error(e):
+    body = {"error": e.message}
+    if e.details:
+        body["details"] = e.details
+    return jsonify(body), e.status
+
+
+def _api_resource(resource):
+    if resource not in API_RESOURCES:
+        raise ApiError(404, f"Unknown resource: {resource}")
+    return API_RESOURCES[resource]
+
+
+def _api_fields(resource):
+    columns = ["id", *API_RESOURCES[resource]]
+    requested = [f.strip() for f in request.args.get("fields", "").split(",") if f.strip()]
+    if not requested:
+        return columns
+    unknown = [f for f in requested if f not in columns]
+    if unknown:
+        raise ApiError(400, f"Unknown field(s): {', '.join(unknown)}")
+    return ["id", *[f for f in columns[1:] if f in requested]]
+
+
+def _api_json(row):
+    return {k: v.isoformat() if isinstance(v, datetime.date) else v for k, v in row.items()}
+
+
+def _api_parse_item(resource, item, partial=False):
+    """Validate one request object into {column: value}. Raises ValueError."""
+    if not isinstance(item, dict):
+        raise ValueError("must be a JSON object")
+    columns = API_RESOURCES[resource]
+    unknown = set(item) - set(columns) - {"id"}
+    if unknown:
+        raise ValueError(f"unknown field(s): {', '.join(sorted(unknown))}")
+    values = {}
+    for column, parse in columns.items():
+        if partial and column not in item:
+            continue
+        raw = item.get(column)
+        try:
+            values[column] = parse(None if raw is None else str(raw))
+        except ValueError as e:
+            raise ValueError(f"{column} {e}")
+    if partial and not values:
+        raise ValueError("has no fields to update")
+    return values
+
+
+def _api_require_writer():
+    if session.get("role") not in ("teacher", "admin"):
+        raise ApiError(403, "Permission denied")
+
+
+def _api_items(resource, partial):
+    """Parse the JSON body into [(id or None, values)], all-or-nothing."""
+    body = request.get_json(silent=True)
+    if body is None:
+        raise ApiError(400, "Request body must be JSON")
+    items = body if isinstance(body, list) else [body]
+    if not items or len(items) > API_MAX_BATCH:
+        raise ApiError(400, f"Send between 1 and {API_MAX_BATCH} items")
+    parsed, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            item_id = None
+            if partial:
+                item_id = item.get("id") if isinstance(item, dict) else None
+                if not isinstance(item_id, int) or isinstance(item_id, bool):
+                    raise ValueError("id must be an integer")
+            parsed.append((item_id, _api_parse_item(resource, item, partial=partial)))
+        except ValueError as e:
+            errors.append({"index": index, "error": str(e)})
+    if errors:
+        raise ApiError(400, "Validation failed", errors)
+    return parsed
+
+
+def _api_after_write(cursor, resource, row, old=None):
+    """Keep counters, the attendance rollup and the search index in step with one write."""
+    if old is None and resource in COUNTED_TABLES:
+        bump_counter(cursor, resource, 1)
+    if resource == "attendance":
+        if old is not None:
+            adjust_attendance_rollup(cursor, old["class_id"], old["date"], -int(_is_present(old["status"])), -1)
+        adjust_attendance_rollup(cursor, row["class_id"], row["date"], int(_is_present(row["status"])), 1)
+    if resource in SEARCH_SOURCES:
+        index_search_document(cursor, resource, row)
+
+
+def _api_write(resource, items):
+    """Create (id None) or update each (id, values) item in one transaction."""
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    rows = []
+    try:
+        begin_write(conn)
+        for item_id, values in items:
+            if item_id is None:
+                columns = ", ".join(values)
+                placeholders = ", ".join(["%s"] * len(values))
+                cursor.execute(f"INSERT INTO {resource} ({columns}) VALUES ({placeholders})", tuple(values.values()))
+                row = {"id": cursor.lastrowid, **values}
+                _api_after_write(cursor, resource, row)
+            else:
+                cursor.execute(f"SELECT * FROM {resource} WHERE id = %s{sql_for_update()}", (item_id,))
+                old = cursor.fetchone()
+                if not old:
+                    raise ApiError(404, f"{resource} {item_id} not found")
+                assignments = ", ".join(f"{column} = %s" for column in values)
+                cursor.execute(f"UPDATE {resource} SET {assignments} WHERE id = %s", (*values.values(), item_id))
+                row = {**old, **values}
+                _api_after_write(cursor, resource, row, old)
+            rows.append(row)
+        bump_table_version(cursor, resource)
+        conn.commit()
+    except ApiError:
+        conn.rollback()
+        raise
+    except mysql.connector.IntegrityError as e:
+        conn.rollback()
+        raise ApiError(409, getattr(e, "msg", None) or str(e))
+    except mysql.connector.Error as e:
+        conn.rollback()
+        app.logger.error("API write DB error", exc_info=e)
+        raise ApiError(500, "Database error. See server logs.")
+    finally:
+        cursor.close()
+        conn.close()
+    if resource == "notices":
+        invalidate_recent_notices()
+    return rows
+
+
+@app.route("/api/v1/<resource>", methods=["GET"])
+@reads_from_replica
+def api_list(resource):
+    _api_resource(resource)
+    columns = ", ".join(_api_fields(resource))
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        ids_arg = request.args.get("ids")
+        if ids_arg is not None:
+            try:
+                ids = list(dict.fromkeys(int(i) for i in ids_arg.split(",") if i.strip()))
+            except ValueError:
+                raise ApiError(400, "ids must be a comma-separated list of integers")
+            if not ids or len(ids) > API_MAX_IDS:
+                raise ApiError(400, f"Pass between 1 and {API_MAX_IDS} ids")
+            placeholders = ", ".join(["%s"] * len(ids))
+            cursor.execute(f"SELECT {columns} FROM {resource} WHERE id IN ({placeholders}) ORDER BY id", ids)
+            return jsonify(data=[_api_json(r) for r in cursor.fetchall()])
+
+        limit = max(1, min(request.args.get("limit", API_PAGE_SIZE, type=int), API_MAX_PAGE_SIZE))
+        after = request.args.get("after", 0, type=int)
+        cursor.execute(
+            f"SELECT {columns} FROM {resource} WHERE id > %s ORDER BY id LIMIT %s",
+            (after, limit + 1),
+        )
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+    next_after = rows[limit - 1]["id"] if len(rows) > limit else None
+    return jsonify(data=[_api_json(r) for r in rows[:limit]], next_after=next_after)
+
+
+@app.route("/api/v1/<resource>/<int:item_id>", methods=["GET"])
+@reads_from_replica
+def api_get(resource, item_id):
+    _api_resource(resource)
+    columns = ", ".join(_api_fields(resource))
+    conn = get_db_connection()
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(f"SELECT {columns} FROM {resource} WHERE id = %s", (item_id,))
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+        conn.close()
+    if not row:
+        raise ApiError(404, f"{resource} {item_id} not found")
+    return jsonify(data=_api_json(row))
+
+
+@app.route("/api/v1/<resource>", methods=["POST"])
+def api_create(resource):
+    _api_resource(resource)
+    _api_require_writer()
+    rows = _api_write(resource, _api_items(resource, partial=False))
+    return jsonify(data=[_api_json(r) for r in rows]), 201
+
+
+@app.route("/api/v1/<resource>", methods=["PATCH"])
+def api_bulk_update(resource):
+    _api_resource(resource)
+    _api_require_writer()
+    rows = _api_write(resource, _api_items(resource, partial=True))
+    return jsonify(data=[_api_json(r) for r in rows])
+
+
+@app.route("/api/v1/<resource>/<int:item_id>", methods=["PATCH"])
+def api_update(resource, item_id):
+    _api_resource(resource)
+    _api_require_writer()
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        raise ApiError(400, "Request body must be a JSON object")
+    try:
+        values = _api_parse_item(resource, body, partial=True)
+    except ValueError as e:
+        raise ApiError(400, "Validation failed", [{"index": 0, "error": str(e)}])
+    rows = _api_write(resource, [(item_id, values)])
+    return jsonify(data=_api_json(rows[0]))
+
+
+# ---------------- Synthetic data ----------------
+# `flask seed` fills the database with a realistic-looking school for load
+# testing and benchmarks (see bench.py). Never run it against real data.
+SCHOOL_DAYS_PER_YEAR = 200
+SEED_FIRST_NAMES = (
+    "Aarav", "Ananya", "Arjun", "Diya", "Ishaan", "Kavya", "Rohan", "Saanvi", "Vihaan", "Zara",
+    "Aditya", "Meera", "Kabir", "Riya", "Dev", "Nisha", "Parth", "Tara", "Yash", "Pooja",
+)
+SEED_LAST_NAMES = (
+    "Sharma", "Verma", "Patel", "Gupta", "Singh", "Khan", "Iyer", "Reddy", "Das", "Mehta",
+    "Joshi", "Nair", "Kapoor", "Bose", "Malhotra", "Chopra", "Rao", "Pillai", "Sethi", "Ali",
+)
+SEED_SUBJECTS = ("Mathematics", "Science", "English", "Hindi", "History", "Geography", "Computer Science", "Art")
+SEED_TABLES = ("attendance", "attendance_monthly", "notices", "fees", "exams", "students", "teachers", "classes")
+
+
+def _seed_name(rng):
+    return f"{rng.choice(SEED_FIRST_NAMES)} {rng.choice(SEED_LAST_NAMES)}"
+
+
+def _seed_insert(conn, cursor, sql, rows, batch_size):
+    for start in range(0, len(rows), batch_size):
+        cursor.executemany(sql, rows[start:start + batch_size])
+        conn.commit()
+
+
+def seed_school(students=500, teachers=40, classes=20, school_days=SCHOOL_DAYS_PER_YEAR, fees=2000,
+                notices=200, exams=50, batch_size=5000, wipe=False, seed=None):
+    """Bulk-generate a school. Attendance gets one row per student per school day.
+
+    Returns {table: rows inserted}. Counters, the attendance rollup, the search
+    index and table versions are rebuilt afterwards so the app sees consistent data.
+    """
+    rng = random.Random(seed)
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    inserted = {}
+    try:
+        if wipe:
+            for table in SEED_TABLES:
+                cursor.execute(f"DELETE FROM {table}")
+            conn.commit()
+
+        class_rows = [(f"Grade {1 + i % 12}-{chr(65 + i // 12 % 26)}{i // 312 or ''}", f"R{100 + i}", _seed_name(rng))
+                      for i in range(classes)]
+        _seed_insert(conn, cursor, "INSERT INTO classes (name, room, class_teacher) VALUES (%s, %s, %s)",
+                     class_rows, batch_size)
+        cursor.execute("SELECT id, name FROM classes")
+        class_ids = dict((name, class_id) for class_id, name in cursor.fetchall())
+        class_names = [name for name, _, _ in class_rows]
+
+        student_rows = [(_seed_name(rng), class_names[i % len(class_names)], rng.randint(5, 18)) for i in range(students)]
+        _seed_insert(conn, cursor, "INSERT INTO students (name, student_class, age) VALUES (%s, %s, %s)",
+                     student_rows, batch_size)
+        cursor.execute("SELECT id, student_class FROM students")
+        enrolled = [(student_id, class_ids[name]) for student_id, name in cursor.fetchall() if name in class_ids]
+
+        teacher_rows = [(_seed_name(rng), rng.choice(SEED_SUBJECTS), f"+91 9{rng.randint(100000000, 999999999)}")
+                        for _ in range(teachers)]
+        _seed_insert(conn, cursor, "INSERT INTO teachers (name, subject, phone) VALUES (%s, %s, %s)",
+                     teacher_rows, batch_size)
+
+        # Weekdays counting back from today
+        days = []
+        day = datetime.date.today()
+        while len(days) < school_days:
+            if day.weekday() < 5:
+                days.append(day)
+            day -= datetime.timedelta(days=1)
+        first_day = days[-1] if days else datetime.date.today()
+
+        attendance_sql = "INSERT INTO attendance (student_id, class_id, date, status) VALUES (%s, %s, %s, %s)"
+        batch = []
+        for day in days:
+            for student_id, class_id in enrolled:
+                batch.append((student_id, class_id, day, "Present" if rng.random() < 0.92 else "Absent"))
+                if len(batch) >= batch_size:
+                    cursor.executemany(attendance_sql, batch)
+                    conn.commit()
+                    batch = []
+        if batch:
+            cursor.executemany(attendance_sql, batch)
+            conn.commit()
+
+        span = max((datetime.date.today() - first_day).days, 1)
+
+        def random_date():
+            return first_day + datetime.timedelta(days=rng.randrange(span + 1))
+
+        all_class_ids = list(class_ids.values())
+        notice_rows = [(rng.choice(all_class_ids + [None]), f"Notice {i + 1}: {rng.choice(SEED_SUBJECTS)} update",
+                        "Please note the schedule change for this week.", random_date()) for i in range(notices)]
+        _seed_insert(conn, cursor, "INSERT INTO notices (class_id, title, message, created_at) VALUES (%s, %s, %s, %s)",
+                     notice_rows, batch_size)
+
+        fee_rows = []
+        for _ in range(fees):
+            paid = rng.random() < 0.8
+            fee_rows.append((rng.choice(student_rows)[0] if student_rows else _seed_name(rng),
+                             rng.choice((1500, 2500, 3200, 4500)), random_date() if paid else None,
+                             "Paid" if paid else "Unpaid"))
+        _seed_insert(conn, cursor, "INSERT INTO fees (student_name, amount, paid_date, status) VALUES (%s, %s, %s, %s)",
+                     fee_rows, batch_size)
+
+        exam_rows = [(f"Unit Test {i + 1} - {rng.choice(SEED_SUBJECTS)}", random_date(), None) for i in range(exams)]
+        _seed_insert(conn, cursor, "INSERT INTO exams (name, exam_date, remarks) VALUES (%s, %s, %s)",
+                     exam_rows, batch_size)
+
+        for table in ("students", "teachers", "classes", "attendance", "notices", "fees", "exams"):
+            bump_table_version(cursor, table)
+        conn.commit()
+
+        inserted = {
+            "classes": len(class_rows),
+            "students": len(student_rows),
+            "teachers": len(teacher_rows),
+            "attendance": len(days) * len(enrolled),
+            "notices": len(notice_rows),
+            "fees": len(fee_rows),
+            "exams": len(exam_rows),
+        }
+    except mysql.connector.Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+    rebuild_counters()
+    rebuild_attendance_rollup()
+    rebuild_search_index()
+    invalidate_recent_notices()
+    return inserted
+
+
+@app.cli.command('seed')
+@click.option('--students', default=500, show_default=True)
+@click.option('--teachers', default=40, show_default=True)
+@click.option('--classes', default=20, show_default=True)
+@click.option('--years', default=1.0, show_default=True, help='Years of daily attendance for every student.')
+@click.option('--fees', default=2000, show_default=True)
+@click.option('--notices', default=200, show_default=True)
+@click.option('--exams', default=50, show_default=True)
+@click.option('--batch-size', default=5000, show_default=True, help='Rows per INSERT/commit.')
+@click.option('--wipe', is_flag=True, help='Delete existing school data (not users) first.')
+@click.option('--seed', 'random_seed', type=int, default=None, help='Random seed for repeatable data.')
+def seed_command(students, teachers, classes, years, fees, notices, exams, batch_size, wipe, random_seed):
+    """Generate synthetic school data for load testing."""
+    if wipe:
+        click.confirm('This deletes all students, teachers, classes, attendance, notices, fees and exams. Continue?',
+                      abort=True)
+    started = time.monotonic()
+    try:
+        inserted = seed_school(students=students, teachers=teachers, classes=classes,
+                               school_days=int(years * SCHOOL_DAYS_PER_YEAR), fees=fees, notices=notices,
+                               exams=exams, batch_size=batch_size, wipe=wipe, seed=random_seed)
+    except mysql.connector.Error as e:
+        click.echo(f"DB error: {e}")
+        return
+    for table, count in inserted.items():
+        click.echo(f"{table}: {count}")
+    click.echo(f"Seeded in {time.monotonic() - started:.1f}s")
+
+
 if __name__ == "__main__":
     # Bind to 0.0.0.0 so localhost and other hosts can reach the dev server if needed.
     # If you only need local access, 127.0.0.1 is fine.
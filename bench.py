@@ -0,0 +1,175 @@
+"""Route-level benchmarks for the School ERP app.
+
+For each size the script wipes and re-seeds the configured database (see
+`flask seed`), then drives the dashboard, list, chart-data and form routes
+through the Flask test client and reports latency percentiles, SQL queries
+per request (from the Server-Timing header) and peak Python memory.
+
+Each route is timed twice: cold, with the app's in-process caches cleared
+before every request so the SQL runs each time, and warm, where repeat
+requests are served from the fragment cache.
+
+Point DB_CONFIG at a throwaway database first -- every run deletes all school
+data in it.
+
+    python bench.py --sizes 1000,100000,1000000 --iterations 20 --yes
+
+`--backend sqlite` runs against a fresh SQLite file instead, so no MySQL
+server is needed:
+
+    python bench.py --backend sqlite --sqlite-path /tmp/bench.sqlite3 --yes
+"""
+import argparse
+import re
+import statistics
+import time
+import tracemalloc
+
+import app as erp
+
+# Approximate attendance rows per size; the other tables scale with it
+DEFAULT_SIZES = (1000, 100000, 1000000)
+
+
+def seed_plan(size):
+    students = max(10, size // erp.SCHOOL_DAYS_PER_YEAR)
+    return dict(
+        students=students,
+        teachers=max(5, students // 25),
+        classes=max(2, students // 40),
+        school_days=max(1, size // students),
+        fees=max(10, size // 10),
+        notices=max(10, size // 100),
+        exams=max(5, size // 1000),
+    )
+
+
+def bench_routes():
+    """(label, url) pairs to drive; ids are looked up from the seeded data."""
+    conn = erp.get_db_pool().connect()
+    cursor = conn.cursor()
+    ids = {}
+    for table in ("students", "teachers", "classes", "attendance", "notices", "fees", "exams"):
+        cursor.execute(f"SELECT MAX(id) FROM {table}")
+        ids[table] = cursor.fetchone()[0] or 0
+    cursor.execute("SELECT MIN(date) FROM attendance")
+    first_day = cursor.fetchone()[0]
+    cursor.close()
+    conn.close()
+
+    routes = [("dashboard", "/")]
+    for table in ("students", "teachers", "classes", "attendance", "notices", "fees", "exams"):
+        routes.append((f"{table} list", f"/{table}"))
+    routes += [
+        ("attendance list, deep page", f"/attendance?after={first_day},{ids['attendance']}"),
+        ("attendance list, filtered", f"/attendance?class_id={ids['classes']}&status=Absent"),
+        ("students list, name filter", "/students?name=A"),
+        ("attendance chart-data", "/attendance/chart-data"),
+        ("fees chart-data", "/fees/chart-data"),
+        ("add attendance form", "/attendance/add"),
+        ("edit attendance form", f"/attendance/edit/{ids['attendance']}"),
+        ("class register", f"/attendance/register?class_id={ids['classes']}"),
+        ("add notice form", "/notices/add"),
+        ("edit student form", f"/students/edit/{ids['students']}"),
+    ]
+    return routes
+
+
+def queries_from_server_timing(response):
+    """Number of SQL statements, from the app's Server-Timing header."""
+    match = re.search(r'db;[^,]*desc="(\d+) queries"', response.headers.get("Server-Timing", ""))
+    return int(match.group(1)) if match else 0
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def clear_caches():
+    """Drop the app's in-process caches so the next request runs its SQL."""
+    erp.fragment_cache.clear()
+    erp._picker_cache.clear()
+    erp.invalidate_recent_notices()
+
+
+def run_route(client, url, iterations, cold=False):
+    client.get(url)  # warm up templates and the pool
+    timings, queries = [], []
+    tracemalloc.start()
+    for _ in range(iterations):
+        if cold:
+            clear_caches()
+        started = time.perf_counter()
+        response = client.get(url)
+        timings.append((time.perf_counter() - started) * 1000)
+        queries.append(queries_from_server_timing(response))
+        response.close()
+        if response.status_code >= 400:
+            raise RuntimeError(f"{url} returned {response.status_code}")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    timings.sort()
+    return {
+        "p50": percentile(timings, 50),
+        "p95": percentile(timings, 95),
+        "p99": percentile(timings, 99),
+        "queries": statistics.median(queries),
+        "peak_kib": peak / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="Comma-separated attendance sizes to seed (default: %(default)s).")
+    parser.add_argument("--iterations", type=int, default=20, help="Requests per route (default: %(default)s).")
+    parser.add_argument("--yes", action="store_true", help="Don't ask before wiping the database.")
+    parser.add_argument("--backend", choices=("mysql", "sqlite"), default=erp.DB_BACKEND,
+                        help="Storage backend to benchmark (default: %(default)s).")
+    parser.add_argument("--sqlite-path", default=erp.SQLITE_PATH, help="Database file for --backend sqlite.")
+    args = parser.parse_args()
+
+    erp.DB_BACKEND = args.backend
+    erp.SQLITE_PATH = args.sqlite_path
+    target = args.sqlite_path if args.backend == "sqlite" else erp.DB_CONFIG.get("database")
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    if not args.yes:
+        answer = input(f"This wipes all school data in database {target!r}. Continue? [y/N] ")
+        if answer.strip().lower() != "y":
+            return
+
+    client = erp.app.test_client()
+    with client.session_transaction() as sess:
+        sess["user_id"] = 1
+        sess["username"] = "bench"
+        sess["role"] = "teacher"
+
+    if args.backend == "sqlite":
+        ok, message = erp.init_db_from_schema()
+        if not ok:
+            raise SystemExit(f"init-db failed: {message}")
+    with erp.app.app_context():
+        erp.upgrade_db()
+
+    for size in sizes:
+        plan = seed_plan(size)
+        started = time.monotonic()
+        with erp.app.app_context():
+            seeded = erp.seed_school(wipe=True, seed=size, **plan)
+        print(f"\n== size {size}: {seeded['attendance']} attendance rows, {seeded['students']} students "
+              f"(seeded in {time.monotonic() - started:.1f}s)")
+        print(f"{'':<30} {'cold':-^35}  {'warm':-^26}")
+        print(f"{'route':<30} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8}  "
+              f"{'p50 ms':>8} {'p95 ms':>8} {'queries':>8} {'peak KiB':>9}")
+        for label, url in bench_routes():
+            cold = run_route(client, url, args.iterations, cold=True)
+            warm = run_route(client, url, args.iterations)
+            peak = max(cold["peak_kib"], warm["peak_kib"])
+            print(f"{label:<30} {cold['p50']:>8.1f} {cold['p95']:>8.1f} {cold['p99']:>8.1f} {cold['queries']:>8.0f}  "
+                  f"{warm['p50']:>8.1f} {warm['p95']:>8.1f} {warm['queries']:>8.0f} {peak:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,2 @@
+-- Add users.role for databases created before roles existed
+ALTER TABLE users ADD COLUMN role VARCHAR(20) NOT NULL DEFAULT 'teacher';
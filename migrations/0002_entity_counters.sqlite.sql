@@ -0,0 +1,11 @@
+-- Dashboard totals maintained by the add/delete routes
+CREATE TABLE IF NOT EXISTS entity_counters (
+    entity VARCHAR(32) PRIMARY KEY,
+    total BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO entity_counters (entity, total) SELECT 'students', COUNT(*) FROM students;
+INSERT OR IGNORE INTO entity_counters (entity, total) SELECT 'teachers', COUNT(*) FROM teachers;
+INSERT OR IGNORE INTO entity_counters (entity, total) SELECT 'classes', COUNT(*) FROM classes;
+INSERT OR IGNORE INTO entity_counters (entity, total) SELECT 'attendance', COUNT(*) FROM attendance;
+INSERT OR IGNORE INTO entity_counters (entity, total) SELECT 'notices', COUNT(*) FROM notices;
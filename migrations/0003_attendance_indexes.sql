@@ -0,0 +1,6 @@
+-- attendance_list: ORDER BY a.date DESC, a.id DESC (InnoDB appends the id)
+CREATE INDEX idx_attendance_date ON attendance (date);
+
+-- JOIN students / class filter, both still ordered by date
+CREATE INDEX idx_attendance_student_date ON attendance (student_id, date);
+CREATE INDEX idx_attendance_class_date ON attendance (class_id, date);
@@ -0,0 +1,16 @@
+-- notices_list / header feed: ORDER BY created_at DESC, id DESC, optional class filter
+CREATE INDEX idx_notices_created_at ON notices (created_at);
+CREATE INDEX idx_notices_class_created_at ON notices (class_id, created_at);
+
+-- fees: paid_date range filter and chart grouping, student name prefix filter
+CREATE INDEX idx_fees_paid_date ON fees (paid_date);
+CREATE INDEX idx_fees_student_name ON fees (student_name);
+
+-- exams_list: ORDER BY exam_date DESC, id DESC
+CREATE INDEX idx_exams_exam_date ON exams (exam_date);
+
+-- name prefix filters and the ORDER BY name pickers on the forms
+CREATE INDEX idx_students_name ON students (name);
+CREATE INDEX idx_students_class ON students (student_class);
+CREATE INDEX idx_teachers_name ON teachers (name);
+CREATE INDEX idx_classes_name ON classes (name);
@@ -0,0 +1,12 @@
+-- One attendance row per student, class and date so the class register can
+-- upsert. Older duplicates are collapsed first, keeping the newest row.
+DELETE a1 FROM attendance a1
+JOIN attendance a2
+  ON a1.student_id = a2.student_id
+ AND a1.class_id = a2.class_id
+ AND a1.date = a2.date
+ AND a1.id < a2.id;
+
+UPDATE entity_counters SET total = (SELECT COUNT(*) FROM attendance) WHERE entity = 'attendance';
+
+CREATE UNIQUE INDEX uq_attendance_student_class_date ON attendance (student_id, class_id, date);
@@ -0,0 +1,8 @@
+-- One attendance row per student, class and date so the class register can
+-- upsert. Older duplicates are collapsed first, keeping the newest row.
+DELETE FROM attendance
+WHERE id NOT IN (SELECT MAX(id) FROM attendance GROUP BY student_id, class_id, date);
+
+UPDATE entity_counters SET total = (SELECT COUNT(*) FROM attendance) WHERE entity = 'attendance';
+
+CREATE UNIQUE INDEX uq_attendance_student_class_date ON attendance (student_id, class_id, date);
@@ -0,0 +1,16 @@
+-- Monthly attendance rollup read by /attendance/chart-data. Kept current by
+-- the attendance routes; `flask rebuild-attendance-rollup` repopulates it.
+CREATE TABLE IF NOT EXISTS attendance_monthly (
+    period CHAR(7) NOT NULL,          -- YYYY-MM
+    class_id INT NOT NULL,
+    present_count INT NOT NULL DEFAULT 0,
+    total_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (period, class_id)
+);
+
+DELETE FROM attendance_monthly;
+
+INSERT INTO attendance_monthly (period, class_id, present_count, total_count)
+SELECT strftime('%Y-%m', date), class_id, SUM(LOWER(status) = 'present'), COUNT(*)
+FROM attendance
+GROUP BY strftime('%Y-%m', date), class_id;
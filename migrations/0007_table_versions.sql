@@ -0,0 +1,16 @@
+-- Per-table change versions, bumped by every write route. Used as HTTP
+-- validators (ETag / Last-Modified) and cache keys.
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name VARCHAR(32) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL
+);
+
+INSERT IGNORE INTO table_versions (table_name, version, updated_at) VALUES
+    ('students', 0, UTC_TIMESTAMP()),
+    ('teachers', 0, UTC_TIMESTAMP()),
+    ('classes', 0, UTC_TIMESTAMP()),
+    ('attendance', 0, UTC_TIMESTAMP()),
+    ('notices', 0, UTC_TIMESTAMP()),
+    ('fees', 0, UTC_TIMESTAMP()),
+    ('exams', 0, UTC_TIMESTAMP());
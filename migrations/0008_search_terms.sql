@@ -0,0 +1,12 @@
+-- Word index behind /search. Binary collation so prefix ranges follow code
+-- point order. `flask db upgrade` indexes existing records after this
+-- migration; the write routes keep it current from then on.
+CREATE TABLE IF NOT EXISTS search_terms (
+    term VARCHAR(64) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL,
+    entity VARCHAR(16) NOT NULL,
+    entity_id INT NOT NULL,
+    weight SMALLINT NOT NULL,
+    PRIMARY KEY (term, entity, entity_id)
+);
+
+CREATE INDEX idx_search_terms_entity ON search_terms (entity, entity_id, term);
@@ -0,0 +1,11 @@
+-- Word index behind /search. `flask db upgrade` indexes existing records after
+-- this migration; the write routes keep it current.
+CREATE TABLE IF NOT EXISTS search_terms (
+    term VARCHAR(64) NOT NULL,
+    entity VARCHAR(16) NOT NULL,
+    entity_id INT NOT NULL,
+    weight SMALLINT NOT NULL,
+    PRIMARY KEY (term, entity, entity_id)
+) WITHOUT ROWID;
+
+CREATE INDEX idx_search_terms_entity ON search_terms (entity, entity_id, term);
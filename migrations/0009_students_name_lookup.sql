@@ -0,0 +1,3 @@
+-- /lookup/students matches a name prefix with LIKE. MySQL's case-insensitive
+-- collation already lets idx_students_name (0004) serve that; SQLite needs
+-- the NOCASE index in 0009_students_name_lookup.sqlite.sql.
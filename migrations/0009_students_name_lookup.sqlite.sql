@@ -0,0 +1,3 @@
+-- SQLite's LIKE is case-insensitive, so only a NOCASE index can serve the
+-- name prefix scans behind /lookup/students and the students name filter.
+CREATE INDEX idx_students_name_nocase ON students (name COLLATE NOCASE);
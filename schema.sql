@@ -60,4 +60,16 @@ CREATE TABLE IF NOT EXISTS users (
     role VARCHAR(20) NOT NULL DEFAULT 'teacher'
 );
 
+-- Dashboard totals, maintained by the add/delete routes (see `flask rebuild-counters`)
+CREATE TABLE IF NOT EXISTS entity_counters (
+    entity VARCHAR(32) PRIMARY KEY,
+    total BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT IGNORE INTO entity_counters (entity, total) SELECT 'students', COUNT(*) FROM students;
+INSERT IGNORE INTO entity_counters (entity, total) SELECT 'teachers', COUNT(*) FROM teachers;
+INSERT IGNORE INTO entity_counters (entity, total) SELECT 'classes', COUNT(*) FROM classes;
+INSERT IGNORE INTO entity_counters (entity, total) SELECT 'attendance', COUNT(*) FROM attendance;
+INSERT IGNORE INTO entity_counters (entity, total) SELECT 'notices', COUNT(*) FROM notices;
+
 ALTER TABLE users ADD COLUMN role VARCHAR(20) NOT NULL DEFAULT 'teacher';
\ No newline at end of file
@@ -0,0 +1,73 @@
+-- SQLite baseline for DB_BACKEND = "sqlite"; mirrors schema.sql.
+-- Later changes are applied by `flask db upgrade` from migrations/.
+
+CREATE TABLE IF NOT EXISTS students (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(100) NOT NULL,
+    student_class VARCHAR(50) NOT NULL,
+    age INT
+);
+
+CREATE TABLE IF NOT EXISTS teachers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(100) NOT NULL,
+    subject VARCHAR(100) NOT NULL,
+    phone VARCHAR(20)
+);
+
+CREATE TABLE IF NOT EXISTS classes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(100) NOT NULL,
+    room VARCHAR(50),
+    class_teacher VARCHAR(100)
+);
+
+CREATE TABLE IF NOT EXISTS attendance (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id INT NOT NULL,
+    class_id INT NOT NULL,
+    date DATE NOT NULL,
+    status VARCHAR(10) NOT NULL  -- Present / Absent
+);
+
+CREATE TABLE IF NOT EXISTS notices (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    class_id INT NULL,          -- NULL means notice is for all classes
+    title VARCHAR(150) NOT NULL,
+    message TEXT NOT NULL,
+    created_at DATE NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS fees (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_name VARCHAR(100) NOT NULL,
+    amount DECIMAL(10,2) NOT NULL,
+    paid_date DATE,
+    status VARCHAR(20) NOT NULL  -- Paid / Unpaid
+);
+
+CREATE TABLE IF NOT EXISTS exams (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(150) NOT NULL,
+    exam_date DATE NOT NULL,
+    remarks VARCHAR(255)
+);
+
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username VARCHAR(50) NOT NULL UNIQUE,
+    password VARCHAR(255) NOT NULL,
+    role VARCHAR(20) NOT NULL DEFAULT 'teacher'
+);
+
+-- Dashboard totals, maintained by the add/delete routes (see `flask rebuild-counters`)
+CREATE TABLE IF NOT EXISTS entity_counters (
+    entity VARCHAR(32) PRIMARY KEY,
+    total BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO entity_counters (entity, total) SELECT 'students', COUNT(*) FROM students;
+INSERT OR IGNORE INTO entity_counters (entity, total) SELECT 'teachers', COUNT(*) FROM teachers;
+INSERT OR IGNORE INTO entity_counters (entity, total) SELECT 'classes', COUNT(*) FROM classes;
+INSERT OR IGNORE INTO entity_counters (entity, total) SELECT 'attendance', COUNT(*) FROM attendance;
+INSERT OR IGNORE INTO entity_counters (entity, total) SELECT 'notices', COUNT(*) FROM notices;
@@ -0,0 +1,152 @@
+// Dashboard charts. Imported on demand by main.js, which only does so on
+// pages that carry a chart; Chart.js itself is fetched from here.
+
+var chartJsPromise = null;
+
+// Inject the Chart.js UMD bundle once; resolves with window.Chart (or null)
+function loadChartJs(src) {
+    if (window.Chart) return Promise.resolve(window.Chart);
+    if (!src) return Promise.resolve(null);
+    if (!chartJsPromise) {
+        chartJsPromise = new Promise(function (resolve) {
+            var script = document.createElement('script');
+            script.src = src;
+            script.async = true;
+            script.onload = function () { resolve(window.Chart || null); };
+            script.onerror = function () { resolve(null); };
+            document.head.appendChild(script);
+        });
+    }
+    return chartJsPromise;
+}
+
+function buildFallbackBarChart(el) {
+    // previous manual bar layout as graceful fallback
+    el.innerHTML = '';
+    var data = {
+        students: parseInt(el.dataset.students || '0', 10),
+        teachers: parseInt(el.dataset.teachers || '0', 10),
+        classes: parseInt(el.dataset.classes || '0', 10),
+        attendance: parseInt(el.dataset.attendance || '0', 10),
+        notices: parseInt(el.dataset.notices || '0', 10)
+    };
+
+    var max = Math.max(data.students, data.teachers, data.classes, data.attendance, data.notices, 1);
+    var maxBarHeight = 150;
+    var items = [
+        { key: 'students', label: 'Students', css: 'bar-students' },
+        { key: 'teachers', label: 'Teachers', css: 'bar-teachers' },
+        { key: 'classes', label: 'Classes', css: 'bar-classes' },
+        { key: 'attendance', label: 'Attendance', css: 'bar-attendance' },
+        { key: 'notices', label: 'Notices', css: 'bar-notices' }
+    ];
+
+    items.forEach(function (item) {
+        var value = data[item.key] || 0;
+        var heightPx = (value / max) * maxBarHeight;
+
+        var wrapper = document.createElement('div');
+        wrapper.className = 'bar-item';
+
+        var bar = document.createElement('div');
+        bar.className = 'bar-fill ' + item.css;
+        bar.style.height = heightPx + 'px';
+
+        var valueLabel = document.createElement('div');
+        valueLabel.className = 'bar-value';
+        valueLabel.textContent = value;
+
+        var label = document.createElement('div');
+        label.className = 'bar-label';
+        label.textContent = item.label;
+
+        wrapper.appendChild(bar);
+        wrapper.appendChild(valueLabel);
+        wrapper.appendChild(label);
+        el.appendChild(wrapper);
+    });
+}
+
+function renderDashboardChart(chartCanvas, fallbackEl) {
+    if (chartCanvas && window.Chart) {
+        // read data
+        var students = parseInt(chartCanvas.dataset.students || '0', 10);
+        var teachers = parseInt(chartCanvas.dataset.teachers || '0', 10);
+        var classes = parseInt(chartCanvas.dataset.classes || '0', 10);
+        var attendance = parseInt(chartCanvas.dataset.attendance || '0', 10);
+        var notices = parseInt(chartCanvas.dataset.notices || '0', 10);
+
+        var labels = ['Students', 'Teachers', 'Classes', 'Attendance', 'Notices'];
+        var values = [students, teachers, classes, attendance, notices];
+
+        var rootStyle = getComputedStyle(document.documentElement);
+        var colorStudents = rootStyle.getPropertyValue('--bar-students').trim() || '#4facfe';
+        var colorTeachers = rootStyle.getPropertyValue('--bar-teachers').trim() || '#43e97b';
+        var colorClasses = rootStyle.getPropertyValue('--bar-classes').trim() || '#fa709a';
+        var colorAttendance = rootStyle.getPropertyValue('--bar-attendance').trim() || '#a18cd1';
+        var colorNotices = rootStyle.getPropertyValue('--bar-notices').trim() || '#fbc2eb';
+
+        // prepare gradients
+        var ctx = chartCanvas.getContext('2d');
+        function makeGradient(color) {
+            try {
+                var g = ctx.createLinearGradient(0, 0, 0, chartCanvas.height || 260);
+                g.addColorStop(0, color);
+                g.addColorStop(1, color + '99');
+                return g;
+            } catch (e) {
+                return color;
+            }
+        }
+
+        var bg = [makeGradient(colorStudents), makeGradient(colorTeachers), makeGradient(colorClasses), makeGradient(colorAttendance), makeGradient(colorNotices)];
+
+        // create chart
+        try {
+            new Chart(ctx, {
+                type: 'bar',
+                data: {
+                    labels: labels,
+                    datasets: [{
+                        label: 'Counts',
+                        data: values,
+                        backgroundColor: bg,
+                        borderRadius: 8,
+                        barPercentage: 0.6,
+                        categoryPercentage: 0.7
+                    }]
+                },
+                options: {
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    plugins: {
+                        legend: { display: false },
+                        tooltip: { enabled: true }
+                    },
+                    scales: {
+                        x: { grid: { display: false }, ticks: { color: getComputedStyle(document.documentElement).getPropertyValue('--muted') || '#666' } },
+                        y: { beginAtZero: true, ticks: { color: getComputedStyle(document.documentElement).getPropertyValue('--muted') || '#666' } }
+                    }
+                }
+            });
+        } catch (e) {
+            // fallback to manual bars
+            console.warn('Chart.js rendering failed, falling back to simple bars', e);
+            if (fallbackEl) { fallbackEl.style.display = ''; buildFallbackBarChart(fallbackEl); }
+            if (chartCanvas) { chartCanvas.style.display = 'none'; }
+        }
+    } else if (fallbackEl) {
+        // Chart.js not available — show fallback
+        if (chartCanvas) { chartCanvas.style.display = 'none'; }
+        fallbackEl.style.display = '';
+        buildFallbackBarChart(fallbackEl);
+    }
+}
+
+export function init(chartJsSrc) {
+    var chartCanvas = document.getElementById('dashboardChart');
+    var fallbackEl = document.getElementById('dashboardBarChart');
+    return loadChartJs(chartJsSrc).then(function () {
+        renderDashboardChart(chartCanvas, fallbackEl);
+    });
+}
@@ -0,0 +1,55 @@
+// Decorative effects (confetti, click sparkles). Imported lazily by main.js
+// once the page is idle, so none of this sits on the critical path.
+
+function isLandingClean() {
+    return document.body.classList.contains('landing-clean') || document.documentElement.classList.contains('landing-clean');
+}
+
+export function spawnConfetti(x, y, count = 28) {
+    // Suppress confetti on landing-clean pages (keeps landing minimal)
+    if (isLandingClean()) { return; }
+    var container = document.createElement('div');
+    container.className = 'confetti-container';
+    container.style.position = 'absolute';
+    container.style.left = (x - 10) + 'px';
+    container.style.top = (y - 10) + 'px';
+    document.body.appendChild(container);
+
+    for (var i = 0; i < count; i++) {
+        (function () {
+            var el = document.createElement('div');
+            el.className = 'confetti';
+            var colors = ['#ff5f6d','#ffc371','#7ee8fa','#b388ff','#ffd166'];
+            var color = colors[Math.floor(Math.random()*colors.length)];
+            el.style.background = color;
+            el.style.left = (Math.random()*40 - 20) + 'px';
+            el.style.top = '0px';
+            el.style.opacity = '1';
+            el.style.transform = 'rotate(' + (Math.random()*360) + 'deg)';
+            container.appendChild(el);
+            setTimeout(function () {
+                el.style.top = (120 + Math.random()*360) + 'px';
+                el.style.left = (parseFloat(el.style.left) + (Math.random()*200 - 100)) + 'px';
+                el.style.opacity = '0';
+            }, 25 + Math.random()*120);
+        })();
+    }
+
+    setTimeout(function () { container.remove(); }, 2400);
+}
+
+var initialised = false;
+
+export function init() {
+    if (initialised) return;
+    initialised = true;
+    // small click sparkle
+    document.addEventListener('click', function (e) {
+        var s = document.createElement('div');
+        s.className = 'click-sparkle';
+        s.style.left = e.pageX + 'px';
+        s.style.top = e.pageY + 'px';
+        document.body.appendChild(s);
+        setTimeout(function () { s.remove(); }, 800);
+    });
+}
@@ -1,3 +1,17 @@
+// Core behaviour shared by every page. Loaded as an ES module; page-specific
+// and decorative code lives in sibling modules imported on demand. Their
+// (fingerprinted) URLs come from data attributes on the <script> tag, since a
+// relative import() would miss the hashed file names in static/dist/.
+var moduleUrls = (document.getElementById('mainScript') || { dataset: {} }).dataset;
+var effectsPromise = null;
+
+function loadEffects() {
+    if (!effectsPromise) {
+        effectsPromise = import(moduleUrls.effectsModule).then(function (fx) { fx.init(); return fx; });
+    }
+    return effectsPromise;
+}
+
 // Modern delete confirmation modal
 function showConfirm(message, href) {
     var modal = document.getElementById('confirmModal');
@@ -87,7 +101,8 @@ document.addEventListener('DOMContentLoaded', function () {
         if (msg.classList.contains('success') || msg.classList.contains('info')) {
             // spawn confetti near message
             var rect = msg.getBoundingClientRect();
-            spawnConfetti(rect.left + rect.width / 2, rect.top + rect.height / 2);
+            var cx = rect.left + rect.width / 2, cy = rect.top + rect.height / 2;
+            loadEffects().then(function (fx) { fx.spawnConfetti(cx, cy); });
         }
 
         // Auto-hide after 5 seconds
@@ -119,128 +134,56 @@ document.addEventListener('DOMContentLoaded', function () {
         });
     }
 
-    // Chart.js dashboard bar chart (with fallback)
-    var chartCanvas = document.getElementById('dashboardChart');
-    var fallbackEl = document.getElementById('dashboardBarChart');
-    function buildFallbackBarChart(el) {
-        // previous manual bar layout as graceful fallback
-        el.innerHTML = '';
-        var data = {
-            students: parseInt(el.dataset.students || '0', 10),
-            teachers: parseInt(el.dataset.teachers || '0', 10),
-            classes: parseInt(el.dataset.classes || '0', 10),
-            attendance: parseInt(el.dataset.attendance || '0', 10),
-            notices: parseInt(el.dataset.notices || '0', 10)
-        };
-
-        var max = Math.max(data.students, data.teachers, data.classes, data.attendance, data.notices, 1);
-        var maxBarHeight = 150;
-        var items = [
-            { key: 'students', label: 'Students', css: 'bar-students' },
-            { key: 'teachers', label: 'Teachers', css: 'bar-teachers' },
-            { key: 'classes', label: 'Classes', css: 'bar-classes' },
-            { key: 'attendance', label: 'Attendance', css: 'bar-attendance' },
-            { key: 'notices', label: 'Notices', css: 'bar-notices' }
-        ];
-
-        items.forEach(function (item) {
-            var value = data[item.key] || 0;
-            var heightPx = (value / max) * maxBarHeight;
-
-            var wrapper = document.createElement('div');
-            wrapper.className = 'bar-item';
-
-            var bar = document.createElement('div');
-            bar.className = 'bar-fill ' + item.css;
-            bar.style.height = heightPx + 'px';
-
-            var valueLabel = document.createElement('div');
-            valueLabel.className = 'bar-value';
-            valueLabel.textContent = value;
-
-            var label = document.createElement('div');
-            label.className = 'bar-label';
-            label.textContent = item.label;
-
-            wrapper.appendChild(bar);
-            wrapper.appendChild(valueLabel);
-            wrapper.appendChild(label);
-            el.appendChild(wrapper);
-        });
-    }
+    // Header search typeahead
+    var searchInput = document.getElementById('headerSearch');
+    var suggestList = document.getElementById('searchSuggestions');
+    if (searchInput && suggestList) {
+        var suggestTimer = null;
+        var suggestRequest = null;
 
-    if (chartCanvas && window.Chart) {
-        // read data
-        var students = parseInt(chartCanvas.dataset.students || '0', 10);
-        var teachers = parseInt(chartCanvas.dataset.teachers || '0', 10);
-        var classes = parseInt(chartCanvas.dataset.classes || '0', 10);
-        var attendance = parseInt(chartCanvas.dataset.attendance || '0', 10);
-        var notices = parseInt(chartCanvas.dataset.notices || '0', 10);
-
-        var labels = ['Students', 'Teachers', 'Classes', 'Attendance', 'Notices'];
-        var values = [students, teachers, classes, attendance, notices];
-
-        var rootStyle = getComputedStyle(document.documentElement);
-        var colorStudents = rootStyle.getPropertyValue('--bar-students').trim() || '#4facfe';
-        var colorTeachers = rootStyle.getPropertyValue('--bar-teachers').trim() || '#43e97b';
-        var colorClasses = rootStyle.getPropertyValue('--bar-classes').trim() || '#fa709a';
-        var colorAttendance = rootStyle.getPropertyValue('--bar-attendance').trim() || '#a18cd1';
-        var colorNotices = rootStyle.getPropertyValue('--bar-notices').trim() || '#fbc2eb';
-
-        // prepare gradients
-        var ctx = chartCanvas.getContext('2d');
-        function makeGradient(color) {
-            try {
-                var g = ctx.createLinearGradient(0, 0, 0, chartCanvas.height || 260);
-                g.addColorStop(0, color);
-                g.addColorStop(1, color + '99');
-                return g;
-            } catch (e) {
-                return color;
-            }
+        function hideSuggestions() {
+            suggestList.hidden = true;
+            suggestList.innerHTML = '';
         }
 
-        var bg = [makeGradient(colorStudents), makeGradient(colorTeachers), makeGradient(colorClasses), makeGradient(colorAttendance), makeGradient(colorNotices)];
-
-        // create chart
-        try {
-            new Chart(ctx, {
-                type: 'bar',
-                data: {
-                    labels: labels,
-                    datasets: [{
-                        label: 'Counts',
-                        data: values,
-                        backgroundColor: bg,
-                        borderRadius: 8,
-                        barPercentage: 0.6,
-                        categoryPercentage: 0.7
-                    }]
-                },
-                options: {
-                    responsive: true,
-                    maintainAspectRatio: false,
-                    plugins: {
-                        legend: { display: false },
-                        tooltip: { enabled: true }
-                    },
-                    scales: {
-                        x: { grid: { display: false }, ticks: { color: getComputedStyle(document.documentElement).getPropertyValue('--muted') || '#666' } },
-                        y: { beginAtZero: true, ticks: { color: getComputedStyle(document.documentElement).getPropertyValue('--muted') || '#666' } }
-                    }
-                }
+        function showSuggestions(results) {
+            suggestList.innerHTML = '';
+            results.forEach(function (r) {
+                var li = document.createElement('li');
+                var a = document.createElement('a');
+                a.href = r.url;
+                var label = document.createElement('span');
+                label.className = 'suggest-label';
+                label.textContent = r.label;
+                a.appendChild(label);
+                a.appendChild(document.createTextNode(r.title));
+                li.appendChild(a);
+                suggestList.appendChild(li);
             });
-        } catch (e) {
-            // fallback to manual bars
-            console.warn('Chart.js rendering failed, falling back to simple bars', e);
-            if (fallbackEl) { fallbackEl.style.display = ''; buildFallbackBarChart(fallbackEl); }
-            if (chartCanvas) { chartCanvas.style.display = 'none'; }
+            suggestList.hidden = results.length === 0;
         }
-    } else if (fallbackEl) {
-        // Chart.js not available — show fallback
-        if (chartCanvas) { chartCanvas.style.display = 'none'; }
-        fallbackEl.style.display = '';
-        buildFallbackBarChart(fallbackEl);
+
+        searchInput.addEventListener('input', function () {
+            clearTimeout(suggestTimer);
+            var q = searchInput.value.trim();
+            if (q.length < 2) { hideSuggestions(); return; }
+            suggestTimer = setTimeout(function () {
+                if (suggestRequest) suggestRequest.abort();
+                suggestRequest = new AbortController();
+                fetch(searchInput.dataset.suggestUrl + '?q=' + encodeURIComponent(q), { signal: suggestRequest.signal })
+                    .then(function (res) { return res.json(); })
+                    .then(function (data) { showSuggestions(data.results || []); })
+                    .catch(function () {});
+            }, 150);
+        });
+
+        searchInput.addEventListener('keydown', function (e) {
+            if (e.key === 'Escape') hideSuggestions();
+        });
+
+        document.addEventListener('click', function (e) {
+            if (!e.target.closest('.header-search')) hideSuggestions();
+        });
     }
 
     // Role toggle on auth forms (login page)
@@ -256,40 +199,6 @@ document.addEventListener('DOMContentLoaded', function () {
         });
     }
 
-    // --- Confetti / party helpers ---
-    function spawnConfetti(x, y, count = 28) {
-        // Suppress confetti on landing-clean pages (keeps landing minimal)
-        if (document.body.classList.contains('landing-clean') || document.documentElement.classList.contains('landing-clean')) { return; }
-        var container = document.createElement('div');
-        container.className = 'confetti-container';
-        container.style.position = 'absolute';
-        container.style.left = (x - 10) + 'px';
-        container.style.top = (y - 10) + 'px';
-        document.body.appendChild(container);
-
-        for (var i = 0; i < count; i++) {
-            (function () {
-                var el = document.createElement('div');
-                el.className = 'confetti';
-                var colors = ['#ff5f6d','#ffc371','#7ee8fa','#b388ff','#ffd166'];
-                var color = colors[Math.floor(Math.random()*colors.length)];
-                el.style.background = color;
-                el.style.left = (Math.random()*40 - 20) + 'px';
-                el.style.top = '0px';
-                el.style.opacity = '1';
-                el.style.transform = 'rotate(' + (Math.random()*360) + 'deg)';
-                container.appendChild(el);
-                setTimeout(function () {
-                    el.style.top = (120 + Math.random()*360) + 'px';
-                    el.style.left = (parseFloat(el.style.left) + (Math.random()*200 - 100)) + 'px';
-                    el.style.opacity = '0';
-                }, 25 + Math.random()*120);
-            })();
-        }
-
-        setTimeout(function () { container.remove(); }, 2400);
-    }
-
     // party toggle: toggles very-crazy UI
     var partyBtn = document.getElementById('partyToggle');
     (function () {
@@ -366,20 +275,32 @@ document.addEventListener('DOMContentLoaded', function () {
             // prevent immediate navigation so animation is visible
             e.preventDefault();
             var href = logoutBtn.href;
-            spawnConfetti(e.pageX, e.pageY, 14);
+            var x = e.pageX, y = e.pageY;
+            loadEffects().then(function (fx) { fx.spawnConfetti(x, y, 14); }, function () {});
             // small timeout to let the effect play, then continue navigation
             setTimeout(function () { window.location.href = href; }, 220);
         });
     }
 
-    // small click sparkle
-    document.addEventListener('click', function (e) {
-        var s = document.createElement('div');
-        s.className = 'click-sparkle';
-        s.style.left = e.pageX + 'px';
-        s.style.top = e.pageY + 'px';
-        document.body.appendChild(s);
-        setTimeout(function () { s.remove(); }, 800);
-    });
+    // Charts: only the dashboard pulls in the chart module and Chart.js
+    if (document.getElementById('dashboardChart') || document.getElementById('dashboardBarChart')) {
+        import(moduleUrls.chartsModule)
+            .then(function (charts) { return charts.init(moduleUrls.chartjs); })
+            .catch(function (e) { console.warn('Charts could not be loaded', e); });
+    }
+
+    // Typeahead pickers (e.g. the student field on attendance forms)
+    if (document.querySelector('input[data-lookup-url]')) {
+        import(moduleUrls.pickerModule)
+            .then(function (picker) { picker.init(); })
+            .catch(function (e) { console.warn('Pickers could not be loaded', e); });
+    }
+
+    // Decorative effects once the browser is idle
+    if (window.requestIdleCallback) {
+        requestIdleCallback(function () { loadEffects(); }, { timeout: 3000 });
+    } else {
+        setTimeout(loadEffects, 1500);
+    }
 
 });
@@ -0,0 +1,99 @@
+// Typeahead pickers: <input data-lookup-url data-target="hiddenId"> fetches
+// matches as the user types and stores the chosen id in the hidden input.
+// Imported by main.js only on pages that have one.
+
+function initPicker(input) {
+    var hidden = document.getElementById(input.dataset.target);
+    var list = input.parentNode.querySelector('.search-suggestions');
+    var classSelect = input.dataset.classSelect && document.getElementById(input.dataset.classSelect);
+    var timer = null;
+    var pending = null;
+    var active = -1;
+
+    function hide() {
+        list.hidden = true;
+        list.innerHTML = '';
+        active = -1;
+    }
+
+    function choose(student) {
+        input.value = student.name;
+        hidden.value = student.id;
+        // Preselect the student's class if none has been chosen yet
+        if (classSelect && !classSelect.value && student.student_class) {
+            Array.prototype.forEach.call(classSelect.options, function (opt) {
+                if (opt.textContent === student.student_class) classSelect.value = opt.value;
+            });
+        }
+        hide();
+    }
+
+    function show(results) {
+        list.innerHTML = '';
+        active = -1;
+        results.forEach(function (student) {
+            var li = document.createElement('li');
+            var a = document.createElement('a');
+            a.href = '#';
+            a.setAttribute('role', 'option');
+            a.appendChild(document.createTextNode(student.name));
+            if (student.student_class) {
+                var label = document.createElement('span');
+                label.className = 'suggest-label';
+                label.textContent = ' ' + student.student_class;
+                a.appendChild(label);
+            }
+            a.addEventListener('mousedown', function (e) {
+                e.preventDefault();
+                choose(student);
+            });
+            a.addEventListener('click', function (e) { e.preventDefault(); });
+            li.appendChild(a);
+            list.appendChild(li);
+        });
+        list.hidden = results.length === 0;
+    }
+
+    function highlight(index) {
+        var links = list.querySelectorAll('a');
+        if (!links.length) return;
+        active = (index + links.length) % links.length;
+        links.forEach(function (a, i) { a.classList.toggle('active', i === active); });
+    }
+
+    input.addEventListener('input', function () {
+        // Typing invalidates an earlier choice
+        hidden.value = '';
+        clearTimeout(timer);
+        var q = input.value.trim();
+        if (q.length < 2) { hide(); return; }
+        timer = setTimeout(function () {
+            if (pending) pending.abort();
+            pending = new AbortController();
+            fetch(input.dataset.lookupUrl + '?q=' + encodeURIComponent(q), { signal: pending.signal })
+                .then(function (res) { return res.json(); })
+                .then(function (data) { show(data.results || []); })
+                .catch(function () {});
+        }, 120);
+    });
+
+    input.addEventListener('keydown', function (e) {
+        if (list.hidden) return;
+        if (e.key === 'ArrowDown' || e.key === 'ArrowUp') {
+            e.preventDefault();
+            highlight(active + (e.key === 'ArrowDown' ? 1 : -1));
+        } else if (e.key === 'Enter' && active >= 0) {
+            e.preventDefault();
+            list.querySelectorAll('a')[active].dispatchEvent(new MouseEvent('mousedown'));
+        } else if (e.key === 'Escape') {
+            hide();
+        }
+    });
+
+    // Without a choice the server falls back to an exact name match
+    input.addEventListener('blur', function () { setTimeout(hide, 150); });
+}
+
+export function init() {
+    document.querySelectorAll('input[data-lookup-url]').forEach(initPicker);
+}
@@ -0,0 +1,32 @@
+import os
+import sys
+from pathlib import Path
+
+# The backend is chosen when app.py is imported, so set it up first
+os.environ["SCHOOL_ERP_DB_BACKEND"] = "sqlite"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest
+
+import app as erp
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A small seeded SQLite school; yields the path of the primary database."""
+    path = str(tmp_path / "primary.sqlite3")
+    monkeypatch.setattr(erp, "SQLITE_PATH", path)
+    monkeypatch.setattr(erp, "_db_pool", None)
+    monkeypatch.setattr(erp, "_replicas", None)
+    monkeypatch.setattr(erp, "DB_REPLICAS", [])
+    with erp.app.app_context():
+        erp.init_db_from_schema()
+        erp.upgrade_db()
+        erp.seed_school(students=30, teachers=3, classes=3, school_days=5, fees=10,
+                        notices=5, exams=3, seed=1)
+    yield path
+    if erp._db_pool is not None:
+        erp._db_pool.dispose()
+    for replica in erp._replicas or []:
+        replica.pool.dispose()
+
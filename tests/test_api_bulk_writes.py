@@ -0,0 +1,78 @@
+import sqlite3
+
+import pytest
+
+import app as erp
+
+
+def query(path, sql, params=()):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def snapshot(path):
+    """Everything a failed bulk write must leave untouched."""
+    return {
+        "counters": query(path, "SELECT entity, total FROM entity_counters ORDER BY entity"),
+        "students": query(path, "SELECT * FROM students ORDER BY id"),
+        "attendance": query(path, "SELECT * FROM attendance ORDER BY id"),
+        "rollup": query(path, "SELECT * FROM attendance_monthly ORDER BY period, class_id"),
+        "search": query(path, "SELECT COUNT(*) FROM search_terms"),
+    }
+
+
+@pytest.fixture
+def client(db):
+    client = erp.app.test_client()
+    with client.session_transaction() as session:
+        session["user_id"] = 1
+        session["username"] = "admin"
+        session["role"] = "admin"
+    return client
+
+
+def test_bulk_create_with_a_duplicate_writes_nothing(db, client):
+    (student_id, class_id, date), = query(db, "SELECT student_id, class_id, date FROM attendance LIMIT 1")
+    (other_student,), = query(db, "SELECT id FROM students WHERE id != ? LIMIT 1", (student_id,))
+    before = snapshot(db)
+    response = client.post("/api/v1/attendance", json=[
+        {"student_id": other_student, "class_id": class_id, "date": "2031-05-01", "status": "Present"},
+        {"student_id": student_id, "class_id": class_id, "date": str(date), "status": "Absent"},
+    ])
+    assert response.status_code == 409
+    assert snapshot(db) == before
+
+
+def test_bulk_create_with_an_invalid_item_writes_nothing(db, client):
+    before = snapshot(db)
+    response = client.post("/api/v1/students", json=[
+        {"name": "Valid Val", "student_class": "Grade 1-A", "age": 9},
+        {"name": "Bad Age", "student_class": "Grade 1-A", "age": "nine"},
+    ])
+    assert response.status_code == 400
+    assert [d["index"] for d in response.get_json()["details"]] == [1]
+    assert snapshot(db) == before
+
+
+def test_bulk_update_with_a_missing_id_writes_nothing(db, client):
+    (student_id,), = query(db, "SELECT id FROM students LIMIT 1")
+    before = snapshot(db)
+    response = client.patch("/api/v1/students", json=[
+        {"id": student_id, "name": "Renamed Rita"},
+        {"id": 10**9, "name": "Nobody"},
+    ])
+    assert response.status_code == 404
+    assert snapshot(db) == before
+
+
+def test_bulk_create_moves_the_counter_once_per_row(db, client):
+    (total,), = query(db, "SELECT total FROM entity_counters WHERE entity = 'students'")
+    response = client.post("/api/v1/students", json=[
+        {"name": "New Nia", "student_class": "Grade 1-A", "age": 9},
+        {"name": "New Noor", "student_class": "Grade 1-A", "age": 10},
+    ])
+    assert response.status_code == 201
+    assert query(db, "SELECT total FROM entity_counters WHERE entity = 'students'") == [(total + 2,)]
@@ -0,0 +1,154 @@
+import sqlite3
+import threading
+import time
+
+import mysql.connector
+import pytest
+
+import app as erp
+
+DAY = "2031-03-02"
+
+
+def query(path, sql, params=()):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def rollup(path):
+    return query(path, "SELECT period, class_id, present_count, total_count FROM attendance_monthly "
+                       "ORDER BY period, class_id")
+
+
+def assert_totals_consistent(path):
+    """entity_counters and the monthly rollup match the attendance table."""
+    (total,), = query(path, "SELECT total FROM entity_counters WHERE entity = 'attendance'")
+    (rows,), = query(path, "SELECT COUNT(*) FROM attendance")
+    assert total == rows
+    before = rollup(path)
+    erp.rebuild_attendance_rollup()
+    assert rollup(path) == before
+
+
+@pytest.fixture
+def school(db):
+    students = [row[0] for row in query(db, "SELECT id FROM students ORDER BY id")]
+    (class_id,), = query(db, "SELECT id FROM classes ORDER BY id LIMIT 1")
+    return students, class_id
+
+
+def test_requests_are_committed_in_batches_and_acked_with_new_rows(db, school):
+    students, class_id = school
+    buffer = erp.AttendanceWriteBuffer(max_rows=1000, max_wait=0.2, max_queued=64)
+    futures = [buffer.submit([(sid, class_id, DAY, "Present")]) for sid in students[:20]]
+    futures.append(buffer.submit([(students[0], class_id, DAY, "Absent")], upsert=True))
+
+    assert [f.result(5) for f in futures] == [1] * 20 + [0]
+    stats = buffer.stats()
+    assert stats["requests"] == 21
+    assert stats["batches"] < stats["requests"]
+    assert query(db, "SELECT status FROM attendance WHERE student_id = ? AND date = ?",
+                 (students[0], DAY)) == [("Absent",)]
+    assert_totals_consistent(db)
+
+
+def test_rejected_request_is_retried_alone_and_the_rest_commit(db, school):
+    students, class_id = school
+    gate = threading.Event()
+    buffer = erp.AttendanceWriteBuffer(max_rows=1000, max_wait=0.2, max_queued=64)
+    buffer.submit([(students[0], class_id, DAY, "Present")]).result(5)
+
+    # Hold the writer until every request is queued so they share one batch
+    flush = buffer._flush
+    buffer._flush = lambda batch: (gate.wait(5), flush(batch))
+    first = buffer.submit([(students[1], class_id, DAY, "Present")])
+    duplicate = buffer.submit([(students[0], class_id, DAY, "Absent")])
+    last = buffer.submit([(students[2], class_id, DAY, "Late")])
+    gate.set()
+
+    assert first.result(5) == 1
+    assert last.result(5) == 1
+    with pytest.raises(mysql.connector.IntegrityError):
+        duplicate.result(5)
+    assert buffer.stats()["retried_batches"] == 1
+    assert query(db, "SELECT COUNT(*) FROM attendance WHERE date = ?", (DAY,)) == [(3,)]
+    assert_totals_consistent(db)
+
+
+def test_concurrent_register_saves_count_each_student_once(db, school, monkeypatch):
+    students, class_id = school
+    monkeypatch.setattr(erp, "ATTENDANCE_GROUP_COMMIT", False)
+    days = [f"2031-{month:02d}-{day:02d}" for month in (4, 5) for day in range(1, 29)]
+    start = threading.Barrier(2)
+    errors = []
+
+    def save_registers(status):
+        try:
+            for day in days:
+                start.wait(5)
+                erp.write_attendance([(sid, class_id, day, status) for sid in students], upsert=True)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save_registers, args=(status,)) for status in ("Present", "Absent")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+
+    assert errors == []
+    assert query(db, "SELECT COUNT(*) FROM attendance WHERE date >= '2031-04-01'") == [(len(days) * len(students),)]
+    assert_totals_consistent(db)
+
+
+def test_full_queue_rejects_new_requests(db, school):
+    students, class_id = school
+    gate = threading.Event()
+    buffer = erp.AttendanceWriteBuffer(max_rows=1, max_wait=0, max_queued=1)
+    flush = buffer._flush
+    buffer._flush = lambda batch: (gate.wait(5), flush(batch))
+    try:
+        running = buffer.submit([(students[0], class_id, DAY, "Present")])
+        while buffer.stats()["queued"]:
+            time.sleep(0.01)  # wait for the writer to take it
+        queued = buffer.submit([(students[1], class_id, DAY, "Present")])
+        with pytest.raises(erp.AttendanceWriteBusy):
+            buffer.submit([(students[2], class_id, DAY, "Present")], timeout=0.05)
+        assert buffer.stats()["rejected"] == 1
+    finally:
+        gate.set()
+    assert running.result(5) == 1
+    assert queued.result(5) == 1
+
+
+def test_writer_does_not_need_the_shared_pool(db, school, monkeypatch):
+    students, class_id = school
+    pool = erp.ConnectionPool(erp.connect_raw, pool_size=1, max_overflow=0, timeout=0.1)
+    monkeypatch.setattr(erp, "_db_pool", pool)
+    held = pool.connect()  # every request connection is in use
+    try:
+        buffer = erp.AttendanceWriteBuffer(max_rows=1000, max_wait=0, max_queued=8)
+        assert buffer.submit([(students[0], class_id, DAY, "Present")]).result(5) == 1
+    finally:
+        held.close()
+        pool.dispose()
+
+
+def test_write_attendance_reports_busy_when_not_acked_in_time(db, school, monkeypatch):
+    students, class_id = school
+    gate = threading.Event()
+    buffer = erp.AttendanceWriteBuffer(max_rows=1000, max_wait=0, max_queued=8)
+    flush = buffer._flush
+    buffer._flush = lambda batch: (gate.wait(5), flush(batch))
+    monkeypatch.setattr(erp, "attendance_write_buffer", buffer)
+    monkeypatch.setattr(erp, "ATTENDANCE_GROUP_COMMIT", True)
+    monkeypatch.setattr(erp, "ATTENDANCE_ACK_TIMEOUT", 0.05)
+    try:
+        with erp.app.test_request_context("/attendance/add", method="POST"):
+            with pytest.raises(erp.AttendanceWriteBusy):
+                erp.write_attendance([(students[0], class_id, DAY, "Present")])
+    finally:
+        gate.set()
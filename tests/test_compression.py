@@ -0,0 +1,67 @@
+import gzip
+
+import pytest
+from flask import Response
+
+import app as erp
+
+BODY = "<tr><td>Student</td><td>Grade 1-A</td></tr>\n" * 200
+BEST = "br" if erp.brotli is not None else "gzip"
+
+
+def compress(response, accept_encoding):
+    headers = {"Accept-Encoding": accept_encoding} if accept_encoding is not None else {}
+    with erp.app.test_request_context(headers=headers):
+        return erp.compress_response(response)
+
+
+def decode(data, encoding):
+    if encoding == "br":
+        return erp.brotli.decompress(data)
+    if encoding == "gzip":
+        return gzip.decompress(data)
+    return data
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("gzip, deflate, br", BEST),
+    ("br;q=0.5, gzip", "gzip"),
+    ("br;q=0, gzip", "gzip"),
+    ("*", BEST),
+    ("gzip;q=0", None),
+    ("identity", None),
+    (None, None),
+])
+def test_encoding_is_negotiated(accept_encoding, expected):
+    response = compress(Response(BODY, mimetype="text/html"), accept_encoding)
+    assert response.headers.get("Content-Encoding") == expected
+    assert "Accept-Encoding" in response.vary
+    assert decode(response.get_data(), expected).decode("utf-8") == BODY
+
+
+def test_streamed_response_is_compressed_chunk_by_chunk():
+    chunks = ["id,name\n"] + [f"{i},Student {i}\n" for i in range(500)]
+    response = compress(Response(iter(chunks), mimetype="text/csv"), "gzip")
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    assert "Accept-Encoding" in response.vary
+    assert gzip.decompress(b"".join(response.response)).decode("utf-8") == "".join(chunks)
+
+
+@pytest.mark.parametrize("make_response", [
+    pytest.param(lambda: Response("small", mimetype="text/html"), id="under the minimum size"),
+    pytest.param(lambda: Response(BODY, mimetype="image/svg+xml"), id="other mimetype"),
+    pytest.param(lambda: Response(BODY, mimetype="text/html", headers={"Content-Encoding": "gzip"}),
+                 id="already encoded"),
+    pytest.param(lambda: Response(BODY, mimetype="text/html", direct_passthrough=True), id="direct passthrough"),
+    pytest.param(lambda: Response(BODY, mimetype="text/html", headers={"Cache-Control": "no-transform"}),
+                 id="no-transform"),
+    pytest.param(lambda: Response(BODY, status=206, mimetype="text/html"), id="partial content"),
+])
+def test_response_is_passed_through(make_response):
+    original = make_response()
+    encoding = original.headers.get("Content-Encoding")
+    response = compress(original, "gzip, br")
+    assert response.headers.get("Content-Encoding") == encoding
+    assert "Accept-Encoding" not in response.vary
+    assert response.get_data() == make_response().get_data()
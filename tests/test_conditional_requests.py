@@ -0,0 +1,52 @@
+import datetime
+import sqlite3
+
+import app as erp
+
+
+def set_updated_at(path, table, updated_at):
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("UPDATE table_versions SET updated_at = ? WHERE table_name = ?", (updated_at, table))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def login():
+    client = erp.app.test_client()
+    with client.session_transaction() as session:
+        session["user_id"] = 1
+        session["username"] = "admin"
+        session["role"] = "admin"
+    return client
+
+
+def test_last_modified_revalidates_with_the_same_date(db):
+    set_updated_at(db, "fees", datetime.datetime(2025, 1, 2, 3, 4, 5))
+    client = login()
+    first = client.get("/fees/chart-data")
+    assert first.status_code == 200
+    assert first.headers["Last-Modified"] == "Thu, 02 Jan 2025 03:04:05 GMT"
+
+    again = client.get("/fees/chart-data", headers={"If-Modified-Since": first.headers["Last-Modified"]})
+    assert again.status_code == 304
+
+
+def test_older_if_modified_since_gets_the_body(db):
+    set_updated_at(db, "fees", datetime.datetime(2025, 1, 2, 3, 4, 5))
+    response = login().get("/fees/chart-data", headers={"If-Modified-Since": "Thu, 02 Jan 2025 03:04:04 GMT"})
+    assert response.status_code == 200
+
+
+def test_write_in_the_current_second_sends_no_last_modified(db):
+    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None, microsecond=0)
+    set_updated_at(db, "fees", now)
+    client = login()
+    response = client.get("/fees/chart-data")
+    assert response.status_code == 200
+    assert "Last-Modified" not in response.headers
+    assert response.headers["ETag"]
+
+    stamped = client.get("/fees/chart-data", headers={"If-Modified-Since": now.strftime("%a, %d %b %Y %H:%M:%S GMT")})
+    assert stamped.status_code == 200
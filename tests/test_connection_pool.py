@@ -0,0 +1,106 @@
+import sqlite3
+import time
+
+import mysql.connector
+import pytest
+
+import app as erp
+
+
+@pytest.fixture
+def make_pool(db):
+    pools = []
+
+    def make(**options):
+        pool = erp.ConnectionPool(erp.connect_raw, **{"timeout": 1, **options})
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.dispose()
+
+
+def count_notices(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM notices").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_returned_connection_is_reused(make_pool):
+    pool = make_pool(pool_size=2, max_overflow=0)
+    conn = pool.connect()
+    assert pool.stats()["checked_out"] == 1
+    conn.close()
+    conn.close()  # a second close is harmless
+    pool.connect().close()
+    stats = pool.stats()
+    assert (stats["checkouts"], stats["connects"], stats["checked_out"], stats["idle"]) == (2, 1, 0, 1)
+
+
+def test_overflow_connections_are_closed_on_return(make_pool):
+    pool = make_pool(pool_size=1, max_overflow=1)
+    first, second = pool.connect(), pool.connect()
+    first.close()
+    second.close()
+    stats = pool.stats()
+    assert (stats["connects"], stats["idle"], stats["discarded"]) == (2, 1, 1)
+
+
+def test_checkout_times_out_when_every_slot_is_taken(make_pool):
+    pool = make_pool(pool_size=1, max_overflow=0, timeout=0.05)
+    held = pool.connect()
+    with pytest.raises(mysql.connector.errors.PoolError):
+        pool.connect()
+    assert pool.stats()["timeouts"] == 1
+    held.close()
+    pool.connect().close()
+
+
+def test_dead_idle_connection_is_replaced_after_a_failed_ping(make_pool):
+    pool = make_pool(pool_size=1, max_overflow=0)
+    pool.connect().close()
+    pool._idle.queue[0][0].close()  # the server went away while it sat idle
+
+    conn = pool.connect()
+    cursor = conn.cursor()
+    cursor.execute("SELECT 1")
+    assert cursor.fetchone() == (1,)
+    conn.close()
+    stats = pool.stats()
+    assert (stats["ping_failures"], stats["connects"]) == (1, 2)
+
+
+def test_old_idle_connection_is_recycled(make_pool):
+    pool = make_pool(pool_size=1, max_overflow=0, recycle=0.01)
+    pool.connect().close()
+    time.sleep(0.02)
+    pool.connect().close()
+    stats = pool.stats()
+    assert (stats["recycled"], stats["connects"]) == (1, 2)
+
+
+def test_open_transaction_is_rolled_back_on_return(db, make_pool):
+    pool = make_pool(pool_size=1, max_overflow=0)
+    before = count_notices(db)
+    conn = pool.connect()
+    conn.cursor().execute("INSERT INTO notices (title, message, created_at) VALUES ('Draft', 'never committed', '2031-01-01')")
+    conn.close()
+
+    assert count_notices(db) == before
+    conn = pool.connect()
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM notices")
+    assert cursor.fetchone()[0] == before
+    conn.close()
+
+
+def test_request_scoped_connection_ignores_close(make_pool):
+    pool = make_pool(pool_size=1, max_overflow=0)
+    conn = pool.connect(request_scoped=True)
+    conn.close()
+    assert pool.stats()["checked_out"] == 1
+    conn.release()
+    assert pool.stats()["checked_out"] == 0
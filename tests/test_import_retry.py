@@ -0,0 +1,71 @@
+import sqlite3
+
+import mysql.connector
+import pytest
+
+import app as erp
+
+CSV = [
+    "name,student_class,age\n",
+    "Import Ida,Grade 1-A,9\n",
+    "Import Ivo,Grade 1-A,10\n",
+    "Import Ines,Grade 2-B,11\n",
+]
+
+
+def query(path, sql, params=()):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def commits(monkeypatch):
+    monkeypatch.setattr(erp, "IMPORT_RETRY_BACKOFF", 0)
+    calls = []
+    commit = erp.SQLiteConnection.commit
+
+    def counting_commit(self):
+        calls.append(1)
+        commit(self)
+
+    monkeypatch.setattr(erp.SQLiteConnection, "commit", counting_commit)
+    return calls
+
+
+def fail_first_executemany(monkeypatch, error):
+    executemany = erp.TimedCursor.executemany
+    failures = [error]
+
+    def flaky(self, operation, seq_params, *args, **kwargs):
+        if failures:
+            raise failures.pop()
+        return executemany(self, operation, seq_params, *args, **kwargs)
+
+    monkeypatch.setattr(erp.TimedCursor, "executemany", flaky)
+
+
+def test_batch_is_retried_whole_after_a_lock_error(db, monkeypatch, commits):
+    (students,), = query(db, "SELECT COUNT(*) FROM students")
+    fail_first_executemany(monkeypatch, mysql.connector.errors.OperationalError(msg="Deadlock found", errno=1213))
+
+    result = erp.import_csv("students", CSV)
+
+    assert (result["inserted"], result["error_count"]) == (3, 0)
+    assert len(commits) == 1
+    assert query(db, "SELECT COUNT(*) FROM students") == [(students + 3,)]
+    assert query(db, "SELECT total FROM entity_counters WHERE entity = 'students'") == [(students + 3,)]
+    assert query(db, "SELECT COUNT(DISTINCT entity_id) FROM search_terms WHERE entity = 'students'") == [(students + 3,)]
+
+
+def test_other_errors_fall_back_to_row_by_row(db, monkeypatch, commits):
+    (students,), = query(db, "SELECT COUNT(*) FROM students")
+    fail_first_executemany(monkeypatch, mysql.connector.errors.DatabaseError(msg="rejected"))
+
+    result = erp.import_csv("students", CSV)
+
+    assert (result["inserted"], result["error_count"]) == (3, 0)
+    assert len(commits) == 3
+    assert query(db, "SELECT total FROM entity_counters WHERE entity = 'students'") == [(students + 3,)]
@@ -0,0 +1,120 @@
+import datetime
+import os
+import sqlite3
+
+import pytest
+
+import app as erp
+
+
+def query(path, sql, params=()):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def execute(path, sql, params=()):
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute(sql, params)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def snapshot(primary, replica):
+    """Bring the replica file up to date with the primary (WAL included)."""
+    src, dst = sqlite3.connect(primary), sqlite3.connect(replica)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+
+
+@pytest.fixture
+def replica(db, tmp_path, monkeypatch):
+    path = str(tmp_path / "replica.sqlite3")
+    snapshot(db, path)
+    monkeypatch.setattr(erp, "DB_REPLICAS", [path])
+    monkeypatch.setattr(erp, "_replica_checked_at", float("-inf"))
+    return path
+
+
+def login(role="admin"):
+    client = erp.app.test_client()
+    with client.session_transaction() as session:
+        session["user_id"] = 1
+        session["username"] = "admin"
+        session["role"] = role
+    return client
+
+
+def replica_reads():
+    return erp.get_replicas()[0].stats()["pool"]["checkouts"]
+
+
+def add_student_on_primary(path, name):
+    execute(path, "INSERT INTO students (name, student_class, age) VALUES (?, 'Grade 1-A', 9)", (name,))
+
+
+def test_read_only_routes_use_the_replica(replica):
+    client = login()
+    before = replica_reads()
+    assert client.get("/students").status_code == 200
+    assert replica_reads() > before
+
+
+def test_writer_reads_from_primary_after_a_post(replica):
+    writer, other = login(), login()
+    response = writer.post("/students/add", data={"name": "Zed Replica", "student_class": "Grade 1-A", "age": "9"})
+    assert response.status_code == 302
+
+    before = replica_reads()
+    assert "Zed Replica" in writer.get("/students?name=Zed").get_data(as_text=True)
+    assert replica_reads() == before
+
+    # Everyone else keeps reading the (not yet caught up) replica
+    assert "Zed Replica" not in other.get("/students?name=Zed").get_data(as_text=True)
+    assert replica_reads() > before
+
+
+def test_lagging_replica_falls_back_to_primary(db, replica):
+    add_student_on_primary(db, "Lagging Lee")
+    minute_ago = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None) - datetime.timedelta(minutes=1)
+    execute(db, "UPDATE table_versions SET version = version + 1, updated_at = ? WHERE table_name = 'students'",
+            (minute_ago,))
+    erp.check_replicas(force=True)
+    assert not erp.get_replicas()[0].usable()
+
+    before = replica_reads()
+    assert "Lagging Lee" in login().get("/students?name=Lagging").get_data(as_text=True)
+    assert replica_reads() == before
+
+
+def test_unreachable_replica_falls_back_to_primary(db, replica):
+    erp.get_replicas()[0].pool.dispose()
+    os.remove(replica)
+    os.mkdir(replica)
+    erp.check_replicas(force=True)
+    assert not erp.get_replicas()[0].usable()
+
+    add_student_on_primary(db, "Down Dana")
+    assert "Down Dana" in login().get("/students?name=Down").get_data(as_text=True)
+
+
+def test_startup_schema_changes_go_to_the_primary(db, tmp_path, monkeypatch):
+    execute(db, "ALTER TABLE users DROP COLUMN role")
+    path = str(tmp_path / "replica.sqlite3")
+    snapshot(db, path)
+    monkeypatch.setattr(erp, "DB_REPLICAS", [path])
+    monkeypatch.setattr(erp, "_replica_checked_at", float("-inf"))
+    monkeypatch.setattr(erp, "_startup_checks_done", False)
+    monkeypatch.setattr(erp, "_startup_checks_next_try", 0.0)
+
+    assert login().get("/students").status_code == 200
+    assert erp._startup_checks_done
+    assert query(db, "SELECT name FROM pragma_table_info('users') WHERE name = 'role'") == [("role",)]
+    assert query(path, "SELECT name FROM pragma_table_info('users') WHERE name = 'role'") == []
@@ -0,0 +1,44 @@
+import sqlite3
+
+import app as erp
+
+
+def execute(path, *statements):
+    conn = sqlite3.connect(path)
+    try:
+        for sql in statements:
+            conn.execute(sql)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def indexed(path):
+    conn = sqlite3.connect(path)
+    try:
+        return dict(conn.execute("SELECT entity, COUNT(DISTINCT entity_id) FROM search_terms GROUP BY entity"))
+    finally:
+        conn.close()
+
+
+def test_upgrade_indexes_existing_records_after_the_search_migration(db):
+    execute(db, "DROP TABLE search_terms", f"DELETE FROM schema_migrations WHERE version >= {erp.SEARCH_TERMS_MIGRATION}")
+    with erp.app.app_context():
+        done = erp.upgrade_db()
+    assert erp.SEARCH_TERMS_MIGRATION in [version for version, _ in done]
+    assert indexed(db)["students"] == 30
+
+
+def test_upgrade_fills_an_empty_index(db):
+    execute(db, "DELETE FROM search_terms")
+    with erp.app.app_context():
+        assert erp.upgrade_db() == []
+    assert indexed(db)["students"] == 30
+
+
+def test_upgrade_leaves_a_populated_index_alone(db, monkeypatch):
+    rebuilds = []
+    monkeypatch.setattr(erp, "rebuild_search_index", lambda: rebuilds.append(1))
+    with erp.app.app_context():
+        assert erp.upgrade_db() == []
+    assert rebuilds == []
@@ -0,0 +1,42 @@
+import json
+import os
+
+import pytest
+from flask import url_for
+
+import app as erp
+
+
+@pytest.fixture
+def static_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(erp.app, "static_folder", str(tmp_path))
+    monkeypatch.setattr(erp, "_static_manifest", None)
+    (tmp_path / erp.STATIC_DIST_DIR).mkdir()
+    return tmp_path / erp.STATIC_DIST_DIR / "manifest.json"
+
+
+def write(path, text, mtime):
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(mtime, mtime))
+
+
+def static_url(filename):
+    with erp.app.test_request_context():
+        return url_for("static", filename=filename)
+
+
+def test_build_after_startup_is_picked_up(static_dir, caplog):
+    assert static_url("css/style.css") == "/static/css/style.css"
+    assert "No static manifest" in caplog.text
+
+    write(static_dir, json.dumps({"css/style.css": "css/style.0123456789ab.css"}), 10**18)
+    assert static_url("css/style.css") == "/static/dist/css/style.0123456789ab.css"
+
+
+def test_unreadable_manifest_is_retried_once_rewritten(static_dir, caplog):
+    write(static_dir, '{"css/style.css": ', 10**18)
+    assert static_url("css/style.css") == "/static/css/style.css"
+    assert "unreadable" in caplog.text
+
+    write(static_dir, json.dumps({"css/style.css": "css/style.0123456789ab.css"}), 10**18 + 1)
+    assert static_url("css/style.css") == "/static/dist/css/style.0123456789ab.css"